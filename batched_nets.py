@@ -0,0 +1,136 @@
+"""
+Batched version of neat.nn.FeedForwardNetwork for a whole generation of genomes.
+All networks are compiled into padded weight and bias arrays, so one frame of decisions for
+the whole population is a few NumPy matrix operations per layer instead of one
+FeedForwardNetwork.activate call per bird.
+"""
+import numpy as np
+import neat
+
+
+# NumPy versies van de activatie functies van neat-python (neat/activations.py)
+ACTIVATIONS = {
+    "sigmoid": lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    "tanh": lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    "relu": lambda z: np.maximum(z, 0.0),
+    "identity": lambda z: z,
+}
+
+
+class BatchedNetworks:
+    """
+    all feed-forward networks of one generation, evaluated together
+
+    Every network gets the same node slots: first the inputs, then the outputs and then its hidden
+    nodes, padded to the largest network. weights[n, i, j] is the weight of the connection from slot i
+    to slot j in network n. Nodes are evaluated in the same topological layers as FeedForwardNetwork.
+    """
+
+    def __init__(self, weights, bias, response, activation, layers, num_inputs, num_outputs):
+        """
+        Initialize the object, use BatchedNetworks.create to build it from genomes
+        :param weights: (networks, slots, slots) array
+        :param bias: (networks, slots) array
+        :param response: (networks, slots) array
+        :param activation: (networks, slots) array with indices into the activation names
+        :param layers: list with one (networks, slots) boolean array per layer
+        :param num_inputs: int
+        :param num_outputs: int
+        :return: None
+        """
+        self.weights = weights
+        self.bias = bias
+        self.response = response
+        self.activation = activation
+        self.layers = layers
+        self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
+        self.activation_names = list(ACTIVATIONS)
+        # Per laag welke activatie functies erin voorkomen, meestal is dat er maar een
+        self.layer_activations = [sorted(set(activation[layer].tolist())) for layer in layers]
+
+    def __len__(self):
+        return len(self.weights)
+
+    @staticmethod
+    def create(genomes, config):
+        """
+        compiles the genomes into one BatchedNetworks object
+        :param genomes: list of genomes
+        :param config: neat config
+        :return: BatchedNetworks
+        """
+        genome_config = config.genome_config
+        input_keys = genome_config.input_keys
+        output_keys = genome_config.output_keys
+        activation_names = list(ACTIVATIONS)
+
+        # Dezelfde lagen en verbindingen als FeedForwardNetwork.create, per netwerk
+        nets = [neat.nn.FeedForwardNetwork.create(genome, config) for genome in genomes]
+        depths = []
+        for genome in genomes:
+            connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+            depths.append(neat.graphs.feed_forward_layers(input_keys, output_keys, connections))
+
+        slots = len(input_keys) + len(output_keys) + max([len(net.node_evals) for net in nets] + [0])
+        num_layers = max([len(layers) for layers in depths] + [0])
+
+        weights = np.zeros((len(nets), slots, slots))
+        bias = np.zeros((len(nets), slots))
+        response = np.ones((len(nets), slots))
+        activation = np.zeros((len(nets), slots), dtype=np.int64)
+        layers = [np.zeros((len(nets), slots), dtype=bool) for _ in range(num_layers)]
+
+        for n, (net, net_layers) in enumerate(zip(nets, depths)):
+            slot = dict((key, i) for i, key in enumerate(input_keys + output_keys))
+            for node, act_func, agg_func, node_bias, node_response, links in net.node_evals:
+                slot.setdefault(node, len(slot))
+
+            layer_of = dict((node, d) for d, layer in enumerate(net_layers) for node in layer)
+            for node, act_func, agg_func, node_bias, node_response, links in net.node_evals:
+                ng = genomes[n].nodes[node]
+                if ng.aggregation != "sum":
+                    raise ValueError("BatchedNetworks only supports sum aggregation, not {!r}".format(ng.aggregation))
+                if ng.activation not in ACTIVATIONS:
+                    raise ValueError("BatchedNetworks does not support activation {!r}".format(ng.activation))
+
+                j = slot[node]
+                bias[n, j] = node_bias
+                response[n, j] = node_response
+                activation[n, j] = activation_names.index(ng.activation)
+                layers[layer_of[node]][n, j] = True
+                for i, w in links:
+                    weights[n, slot[i], j] += w
+
+        return BatchedNetworks(weights, bias, response, activation, layers, len(input_keys), len(output_keys))
+
+    def activate(self, inputs, which=None):
+        """
+        evaluates the networks, gives the same outputs as FeedForwardNetwork.activate
+        :param inputs: (n, num_inputs) array, one row per network
+        :param which: indices of the n networks to evaluate, or None for all networks
+        :return: (n, num_outputs) array
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        if which is None:
+            which = slice(None)
+        weights = self.weights[which]
+        bias = self.bias[which]
+        response = self.response[which]
+        activation = self.activation[which]
+
+        values = np.zeros(bias.shape)
+        values[:, :self.num_inputs] = inputs
+
+        # Elke laag wordt voor alle netwerken tegelijk uitgerekend
+        for layer, layer_activations in zip(self.layers, self.layer_activations):
+            layer = layer[which]
+            z = bias + response * np.einsum("nk,nkm->nm", values, weights)
+            if len(layer_activations) == 1:
+                values = np.where(layer, ACTIVATIONS[self.activation_names[layer_activations[0]]](z), values)
+                continue
+            for a in layer_activations:
+                selected = layer & (activation == a)
+                values[selected] = ACTIVATIONS[self.activation_names[a]](z[selected])
+
+        return values[:, self.num_inputs:self.num_inputs + self.num_outputs]
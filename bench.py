@@ -0,0 +1,226 @@
+"""
+Benchmarks for the simulation and training speed, always headless and with fixed seeds.
+The results are written as JSON, so runs on different commits can be compared.
+
+    python bench.py                        # all benchmarks, results on stdout
+    python bench.py --output results.json  # results to a file
+    python bench.py --only physics collision --repeat 5
+"""
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+# Benchmarks draaien altijd zonder scherm
+os.environ["FLAPPY_HEADLESS"] = "1"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import neat
+import numpy as np
+import pygame
+
+import flappy_bird_neat as game
+import hitbox
+import population
+
+LOCAL_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(LOCAL_DIR, "config-feedforward.txt")
+SEED = 1234
+
+
+def load_config(pop_size=None):
+    """
+    loads the neat config, optionally with another population size
+    :param pop_size: int
+    :return: neat config
+    """
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                                CONFIG_PATH)
+    if pop_size is not None:
+        config.pop_size = pop_size
+    return config
+
+
+def bench_physics(steps=200000):
+    """
+    Bird.move steps per second for a single bird that jumps every 30 frames
+    """
+    bird = game.Bird(230, 350)
+    start = time.perf_counter()
+    for i in range(steps):
+        if i % 30 == 0:
+            bird.jump()
+        bird.move()
+    elapsed = time.perf_counter() - start
+    return {"steps": steps, "seconds": elapsed, "steps_per_sec": steps / elapsed}
+
+
+def bench_collision(checks=100000, collide=game.Pipe.collide):
+    """
+    Pipe.collide (or hitbox.collide) checks per second, with birds on seeded positions around a pipe
+    """
+    rng = random.Random(SEED)
+    pipe = game.Pipe(200, game.Course(SEED)[0])
+    birds = []
+    for i in range(1000):
+        bird = game.Bird(rng.randrange(100, 330), rng.randrange(0, 700))
+        birds.append(bird)
+
+    start = time.perf_counter()
+    hits = 0
+    for i in range(checks):
+        hits += collide(pipe, birds[i % len(birds)], None)
+    elapsed = time.perf_counter() - start
+    return {"checks": checks, "hits": hits, "seconds": elapsed, "checks_per_sec": checks / elapsed}
+
+
+def bench_render(frames=2000, birds=50):
+    """
+    draw_window frames per second on a surface without a screen, with seeded birds and moving pipes
+    """
+    rng = random.Random(SEED)
+    course = game.Course(SEED)
+    flock = [game.Bird(230, rng.randrange(100, 600)) for _ in range(birds)]
+    pipes = [game.Pipe(700, course[0]), game.Pipe(400, course[1])]
+    base = game.Base(game.FLOOR)
+    surface = pygame.Surface((game.WIN_WIDTH, game.WIN_HEIGHT))
+
+    game.dirty_rects.reset()
+    start = time.perf_counter()
+    for i in range(frames):
+        for pipe in pipes:
+            pipe.move()
+            if pipe.x < -100:
+                pipe.x += 600
+        base.move()
+        game.draw_window(surface, flock, pipes, base, i // 100, 1, 0)
+    elapsed = time.perf_counter() - start
+    return {"frames": frames, "birds": birds, "seconds": elapsed, "frames_per_sec": frames / elapsed}
+
+
+def bench_generation(pop_size, eval_function):
+    """
+    one generation of random genomes with the given population size
+    """
+    random.seed(SEED)
+    config = load_config(pop_size)
+    genomes = list(neat.Population(config).population.items())
+
+    game.profiler.reset()
+    start = time.perf_counter()
+    eval_function(genomes, config)
+    elapsed = time.perf_counter() - start
+    return {
+        "pop_size": pop_size,
+        "seconds": elapsed,
+        "frames": game.profiler.frames,
+        "frames_per_sec": game.profiler.frames / elapsed,
+        "best_fitness": max(genome.fitness for genome_id, genome in genomes),
+    }
+
+
+def bench_training(generations, eval_function):
+    """
+    wall time of a whole p.run(eval_function, generations) with a fixed seed
+    """
+    random.seed(SEED)
+    game.gen = 0
+    p = neat.Population(load_config())
+    start = time.perf_counter()
+    winner = p.run(eval_function, generations)
+    elapsed = time.perf_counter() - start
+    return {"generations": p.generation, "seconds": elapsed, "best_fitness": winner.fitness}
+
+
+BENCHMARKS = {
+    "physics": lambda: bench_physics(),
+    "collision": lambda: bench_collision(),
+    "collision_gap": lambda: bench_collision(collide=hitbox.collide),
+    "render": lambda: bench_render(),
+    "generation_50": lambda: bench_generation(50, game.eval_genomes),
+    "generation_500": lambda: bench_generation(500, game.eval_genomes),
+    "generation_5000": lambda: bench_generation(5000, game.eval_genomes),
+    "generation_50_vectorized": lambda: bench_generation(50, population.eval_genomes),
+    "generation_500_vectorized": lambda: bench_generation(500, population.eval_genomes),
+    "generation_5000_vectorized": lambda: bench_generation(5000, population.eval_genomes),
+    "training_50": lambda: bench_training(50, game.eval_genomes),
+    "training_50_vectorized": lambda: bench_training(50, population.eval_genomes),
+}
+
+
+def git_commit():
+    """
+    the commit the benchmarks ran on, or None outside a git checkout
+    :return: str
+    """
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=LOCAL_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def neat_version():
+    """
+    the installed version of neat-python, the neat module itself has no __version__
+    :return: str, or None if neat-python is not installed as a package
+    """
+    try:
+        return importlib.metadata.version("neat-python")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def run_benchmarks(names, repeat=3):
+    """
+    runs the benchmarks, every benchmark is repeated and the fastest run is kept
+    :param names: names of the benchmarks to run
+    :param repeat: number of runs per benchmark (int)
+    :return: dict with the results
+    """
+    results = {}
+    for name in names:
+        runs = [BENCHMARKS[name]() for _ in range(repeat)]
+        best = min(runs, key=lambda run: run["seconds"])
+        best["all_seconds"] = [run["seconds"] for run in runs]
+        results[name] = best
+        print("{:<28} {:8.3f} s".format(name, best["seconds"]), file=sys.stderr)
+
+    return {
+        "commit": git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": SEED,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "neat": neat_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for Bird of Flappy")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the fastest is kept")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.only or list(BENCHMARKS), args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Evaluates trained birds on many seeded courses at once, without a screen.
+Every bird plays every course, the courses are spread over worker processes and within a worker all
+courses are simulated together with population.simulate_courses. The result is the score
+distribution of every bird and where it fails.
+
+    python flappy_bird_neat.py eval --courses 5000 --champion ChickenDinner.json --champion other.json
+"""
+import json
+import multiprocessing
+import pickle
+
+import numpy as np
+
+import flappy_bird_neat as game
+import champion
+import parallel
+from population import simulate_courses
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def load_champion_data(filename, config):
+    """
+    reads a champion file or an old pickled genome
+    :param filename: str
+    :param config: neat config, only needed for a pickled genome
+    :return: dict in the champion format
+    """
+    if filename.endswith(".json"):
+        with open(filename) as f:
+            return json.load(f)
+    with open(filename, "rb") as f:
+        return champion.from_genome(pickle.load(f), config)
+
+
+def play_courses(net, seeds, max_score=None):
+    """
+    lets one bird play every course at the same time, with the same rules as play_headless
+    :param net: Champion
+    :param seeds: list with the seed of every course
+    :param max_score: a game stops when the score gets higher than this, None uses game.MAX_SCORE (int)
+    :return: (score array, frames array, list with the cause of death per course)
+    """
+    def activate(alive, inputs):
+        return net.activate_batch(inputs)[:, 0]
+
+    return simulate_courses(activate, seeds, max_score)
+
+
+def eval_chunk(data, seeds, max_score, settings=None):
+    """
+    plays one chunk of courses, runs in a worker process
+    :param settings: dict from parallel.settings() of the main process, for --collision
+    :return: (scores, frames, causes) as lists
+    """
+    parallel.apply_settings(settings)
+    scores, frames, causes = play_courses(champion.Champion(data), seeds, max_score)
+    return scores.tolist(), frames.tolist(), causes
+
+
+def summarize(seeds, scores, frames, causes, max_score):
+    """
+    the score distribution and failure points of one bird
+    :return: dict
+    """
+    scores = np.asarray(scores)
+    failed = [i for i, cause in enumerate(causes) if cause != "finished"]
+    deaths_by_pipe = {}
+    for i in failed:
+        deaths_by_pipe[int(scores[i])] = deaths_by_pipe.get(int(scores[i]), 0) + 1
+    cause_counts = {}
+    for cause in causes:
+        cause_counts[cause] = cause_counts.get(cause, 0) + 1
+
+    worst = sorted(range(len(seeds)), key=lambda i: scores[i])[:10]
+    return {
+        "courses": len(seeds),
+        "mean": float(scores.mean()),
+        "std": float(scores.std()),
+        "min": int(scores.min()),
+        "max": int(scores.max()),
+        "percentiles": dict((str(p), float(np.percentile(scores, p))) for p in PERCENTILES),
+        "finished": cause_counts.get("finished", 0) / len(seeds),
+        "max_score": max_score,
+        "mean_frames": float(np.mean(frames)),
+        "causes": cause_counts,
+        # De pijpen waar de vogel het vaakst doodgaat
+        "deaths_by_pipe": dict(sorted(deaths_by_pipe.items(), key=lambda item: -item[1])[:10]),
+        # De slechtste banen, om na te kijken met python flappy_bird_neat.py play --seed N
+        "worst_seeds": [{"seed": seeds[i], "score": int(scores[i]), "cause": causes[i]} for i in worst],
+    }
+
+
+def evaluate(filenames, config, seeds, workers=None, chunk_size=250, max_score=None):
+    """
+    evaluates every bird on every course
+    :param filenames: files with the birds
+    :param config: neat config
+    :param seeds: seeds of the courses
+    :param workers: number of worker processes, None uses all cores (int)
+    :param chunk_size: courses per chunk (int)
+    :param max_score: None uses game.MAX_SCORE (int)
+    :return: dict with a summary per file
+    """
+    if max_score is None:
+        max_score = game.MAX_SCORE
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+
+    report = {}
+    with multiprocessing.Pool(workers or multiprocessing.cpu_count()) as pool:
+        for filename in filenames:
+            data = load_champion_data(filename, config)
+            results = pool.starmap(eval_chunk, [(data, chunk, max_score, parallel.settings()) for chunk in chunks])
+            scores = [s for r in results for s in r[0]]
+            frames = [f for r in results for f in r[1]]
+            causes = [c for r in results for c in r[2]]
+            report[filename] = summarize(seeds, scores, frames, causes, max_score)
+    return report
+
+
+def print_report(report):
+    """
+    prints a table with the most important numbers of every bird
+    :param report: dict from evaluate
+    :return: None
+    """
+    print("{:<30} {:>8} {:>7} {:>6} {:>6} {:>6} {:>9}".format("bird", "courses", "mean", "p5", "p50", "p95", "finished"))
+    for filename, summary in report.items():
+        p = summary["percentiles"]
+        print("{:<30} {:>8} {:>7.1f} {:>6.0f} {:>6.0f} {:>6.0f} {:>8.1%}".format(
+            filename, summary["courses"], summary["mean"], p["5"], p["50"], p["95"], summary["finished"]))
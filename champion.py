@@ -0,0 +1,206 @@
+"""
+Small, versioned file format for trained birds.
+Instead of pickling a whole neat.DefaultGenome, only the pruned feed-forward network is saved as
+flat JSON arrays. Loading it needs no neat-python and no pickle, so champion files from anywhere
+are safe to load, and Champion.activate gives a decision in a few microseconds.
+
+    python champion.py ChickenDinner.txt ChickenDinner.json   # converts a pickled genome
+"""
+import json
+import math
+import sys
+
+FORMAT = "flappy-champion"
+VERSION = 1
+
+
+def sigmoid_activation(z):
+    z = max(-60.0, min(60.0, 5.0 * z))
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def tanh_activation(z):
+    z = max(-60.0, min(60.0, 2.5 * z))
+    return math.tanh(z)
+
+
+def relu_activation(z):
+    return z if z > 0.0 else 0.0
+
+
+def identity_activation(z):
+    return z
+
+
+# Dezelfde activatie functies als neat-python, zodat een champion precies hetzelfde beslist als het genome
+ACTIVATIONS = {
+    "sigmoid": sigmoid_activation,
+    "tanh": tanh_activation,
+    "relu": relu_activation,
+    "identity": identity_activation,
+}
+
+
+def from_genome(genome, config):
+    """
+    converts a genome to the champion format, only the nodes that are needed for the outputs are kept
+    :param genome: neat genome
+    :param config: neat config
+    :return: dict
+    """
+    import neat
+
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    data = {
+        "format": FORMAT,
+        "version": VERSION,
+        "inputs": list(net.input_nodes),
+        "outputs": list(net.output_nodes),
+        "nodes": [],
+        "bias": [],
+        "response": [],
+        "activation": [],
+        "link_start": [],
+        "link_source": [],
+        "link_weight": [],
+    }
+    # De verbindingen van alle nodes staan achter elkaar, link_start zegt waar die van een node beginnen
+    for node, act_func, agg_func, bias, response, links in net.node_evals:
+        ng = genome.nodes[node]
+        if ng.aggregation != "sum":
+            raise ValueError("the champion format only supports sum aggregation, not {!r}".format(ng.aggregation))
+        if ng.activation not in ACTIVATIONS:
+            raise ValueError("the champion format does not support activation {!r}".format(ng.activation))
+        data["nodes"].append(node)
+        data["bias"].append(bias)
+        data["response"].append(response)
+        data["activation"].append(ng.activation)
+        data["link_start"].append(len(data["link_source"]))
+        for i, w in links:
+            data["link_source"].append(i)
+            data["link_weight"].append(w)
+    data["link_start"].append(len(data["link_source"]))
+    return data
+
+
+def save(data, filename):
+    """
+    writes a champion to a file
+    :param data: dict from from_genome
+    :param filename: str
+    :return: None
+    """
+    with open(filename, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+
+def export_genome(genome, config, filename):
+    """
+    writes a genome to a file in the champion format
+    :param genome: neat genome
+    :param config: neat config
+    :param filename: str
+    :return: None
+    """
+    save(from_genome(genome, config), filename)
+
+
+def load(filename):
+    """
+    reads a champion file
+    :param filename: str
+    :return: Champion
+    """
+    with open(filename) as f:
+        return Champion(json.load(f))
+
+
+class Champion:
+    """
+    evaluates a network in the champion format, without neat-python
+    """
+
+    def __init__(self, data):
+        """
+        Initialize the champion, checks the format and compiles the network
+        :param data: dict in the champion format
+        :return: None
+        """
+        if data.get("format") != FORMAT:
+            raise ValueError("not a champion file")
+        if data.get("version") != VERSION:
+            raise ValueError("unsupported champion version {!r}".format(data.get("version")))
+
+        self.data = data
+        self.input_nodes = data["inputs"]
+        self.output_nodes = data["outputs"]
+        values = dict((key, 0.0) for key in self.input_nodes + self.output_nodes)
+        for node in data["nodes"]:
+            values.setdefault(node, 0.0)
+        self.slot = dict((key, i) for i, key in enumerate(values))
+        self.num_values = len(values)
+        self.output_slots = [self.slot[key] for key in self.output_nodes]
+
+        # Per node: (slot, activatie functie, bias, response, [(slot van de bron, gewicht), ...])
+        starts = data["link_start"]
+        self.node_evals = []
+        for n, node in enumerate(data["nodes"]):
+            if data["activation"][n] not in ACTIVATIONS:
+                raise ValueError("unsupported activation {!r}".format(data["activation"][n]))
+            links = [(self.slot[data["link_source"][i]], data["link_weight"][i]) for i in range(starts[n], starts[n + 1])]
+            self.node_evals.append((self.slot[node], ACTIVATIONS[data["activation"][n]],
+                                    data["bias"][n], data["response"][n], links))
+
+    def activate(self, inputs):
+        """
+        evaluates the network, gives the same outputs as FeedForwardNetwork.activate
+        :param inputs: list of input values
+        :return: list of output values
+        """
+        if len(inputs) != len(self.input_nodes):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
+
+        values = [0.0] * self.num_values
+        values[:len(inputs)] = inputs
+        for slot, act_func, bias, response, links in self.node_evals:
+            s = 0.0
+            for i, w in links:
+                s += values[i] * w
+            values[slot] = act_func(bias + response * s)
+        return [values[i] for i in self.output_slots]
+
+    def activate_batch(self, inputs):
+        """
+        evaluates the network for many input rows at once, needs numpy
+        :param inputs: (n, inputs) array
+        :return: (n, outputs) array
+        """
+        import numpy as np
+        from batched_nets import ACTIVATIONS as NUMPY_ACTIVATIONS
+
+        inputs = np.asarray(inputs, dtype=float)
+        values = np.zeros((len(inputs), self.num_values))
+        values[:, :inputs.shape[1]] = inputs
+        for n, (slot, act_func, bias, response, links) in enumerate(self.node_evals):
+            s = np.zeros(len(inputs))
+            for i, w in links:
+                s += values[:, i] * w
+            values[:, slot] = NUMPY_ACTIVATIONS[self.data["activation"][n]](bias + response * s)
+        return values[:, self.output_slots]
+
+
+if __name__ == "__main__":
+    import os
+    import pickle
+    import neat
+
+    if len(sys.argv) != 3:
+        print("gebruik: python champion.py ChickenDinner.txt ChickenDinner.json")
+        sys.exit(1)
+
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt")
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                                config_path)
+    with open(sys.argv[1], "rb") as save_file:
+        export_genome(pickle.load(save_file), config, sys.argv[2])
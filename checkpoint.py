@@ -0,0 +1,118 @@
+"""
+Checkpoints of a training run, so a run that is stopped (crash, Ctrl-C or a preempted machine)
+can continue from the last finished generation instead of starting over.
+A checkpoint contains the population, species, random state, the gen counter of the game and the
+StatisticsReporter, and is written atomically: a checkpoint file is always complete.
+"""
+import glob
+import gzip
+import itertools
+import os
+import pickle
+import random
+
+import neat
+
+import flappy_bird_neat as game
+
+PREFIX = "neat-checkpoint-"
+
+
+class AtomicCheckpointer(neat.Checkpointer):
+    """
+    neat.Checkpointer that writes to a temporary file first and then renames it, and that also
+    saves the gen counter and the statistics
+    """
+
+    def __init__(self, directory, stats=None, generation_interval=5, time_interval_seconds=300, keep=3):
+        """
+        Initialize the checkpointer
+        :param directory: folder for the checkpoints, created if it doesn't exist (str)
+        :param stats: StatisticsReporter to save with every checkpoint
+        :param generation_interval: maximum number of generations between checkpoints (int)
+        :param time_interval_seconds: maximum number of seconds between checkpoints (float)
+        :param keep: number of checkpoints to keep, None keeps all (int)
+        :return: None
+        """
+        os.makedirs(directory, exist_ok=True)
+        neat.Checkpointer.__init__(self, generation_interval, time_interval_seconds,
+                                   os.path.join(directory, PREFIX))
+        self.directory = directory
+        self.stats = stats
+        self.keep = keep
+
+    def save_checkpoint(self, config, population, species_set, generation):
+        """
+        saves the state at the end of a generation
+        :return: None
+        """
+        filename = "{0}{1}".format(self.filename_prefix, generation)
+        print("Saving checkpoint to {0}".format(filename))
+
+        # De reporters van de species set (met bijvoorbeeld het open telemetry bestand) horen niet in de
+        # checkpoint, restore_checkpoint geeft de species set de reporters van de nieuwe population
+        reporters = species_set.reporters
+        species_set.reporters = None
+        data = (generation, config, population, species_set, random.getstate(), game.gen, self.stats)
+        # Eerst naar een tijdelijk bestand, pas als dat helemaal geschreven is krijgt het de echte naam
+        try:
+            with open(filename + ".tmp", "wb") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=5) as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(filename + ".tmp", filename)
+        except BaseException:
+            if os.path.exists(filename + ".tmp"):
+                os.remove(filename + ".tmp")
+            raise
+        finally:
+            species_set.reporters = reporters
+
+        if self.keep is not None:
+            for old in checkpoints(self.directory)[:-self.keep]:
+                os.remove(old)
+
+
+def checkpoints(directory):
+    """
+    all checkpoints in a folder, oldest first
+    :param directory: str
+    :return: list of filenames
+    """
+    files = glob.glob(os.path.join(directory, PREFIX + "*"))
+    files = [f for f in files if f[len(os.path.join(directory, PREFIX)):].isdigit()]
+    return sorted(files, key=lambda f: int(f[len(os.path.join(directory, PREFIX)):]))
+
+
+def latest_checkpoint(directory):
+    """
+    the newest checkpoint in a folder
+    :param directory: str
+    :return: filename, or None if there are no checkpoints
+    """
+    files = checkpoints(directory)
+    return files[-1] if files else None
+
+
+def restore_checkpoint(filename):
+    """
+    restores a training run from a checkpoint
+    :param filename: str
+    :return: (neat Population, StatisticsReporter or None)
+    """
+    with gzip.open(filename) as f:
+        generation, config, population, species_set, rndstate, gen, stats = pickle.load(f)
+
+    random.setstate(rndstate)
+    game.gen = gen
+
+    # De checkpoint is gemaakt na de reproductie, de population hoort dus al bij de volgende generatie
+    p = neat.Population(config, (population, species_set, generation + 1))
+    species_set.reporters = p.reporters
+    # Nieuwe genomes mogen geen key krijgen die al gebruikt wordt
+    p.reproduction.genome_indexer = itertools.count(max(population) + 1)
+    # De beste genome van voor de checkpoint, Population.run vervangt hem alleen door een betere
+    if stats is not None and stats.most_fit_genomes:
+        p.best_genome = stats.best_genome()
+    return p, stats
@@ -0,0 +1,279 @@
+"""
+Evaluates a generation on worker processes on other machines.
+The training runs a Coordinator that listens on a TCP port. Workers connect to it, get the neat
+config once and then get batches of genomes with the seed of the course of the generation. Every
+batch is played with parallel.eval_chunk, so the fitness is the same as with --workers or
+--vectorized. A worker can connect or disconnect at any time: the batch of a worker that
+disconnects or does not answer within the timeout is given to another worker.
+
+    python flappy_bird_neat.py train --headless --cluster :6010                # on the training machine
+    python flappy_bird_neat.py worker --cluster trainer.local:6010             # on every other machine
+
+The connections use multiprocessing.connection: pickled messages and a handshake with a shared key.
+Set FLAPPY_CLUSTER_KEY to the same secret on every machine, there is no default key because whoever
+knows the key can send messages that are unpickled. Even with a key, only use this on a network you trust.
+"""
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import flappy_bird_neat as game
+import parallel
+
+PORT = 6010
+# Genomes per batch, kleinere batches verdelen beter over langzame en snelle workers
+BATCH_SIZE = 10
+# Seconden die een worker over een batch mag doen voordat een andere worker hem krijgt
+TIMEOUT = 60
+# Zo vaak mag een batch bij een worker mislukken (te laat of de worker is weg), daarna stopt de training
+ATTEMPTS = 3
+
+
+def authkey():
+    """
+    the shared key of the coordinator and the workers, from FLAPPY_CLUSTER_KEY
+    :return: bytes
+    """
+    key = os.environ.get("FLAPPY_CLUSTER_KEY")
+    if not key:
+        raise RuntimeError("set FLAPPY_CLUSTER_KEY to the same secret on the training and every worker machine")
+    return key.encode()
+
+
+def parse_address(address):
+    """
+    turns "host:port" into a (host, port) tuple, without a host every network interface is used
+    :param address: str like "trainer.local:6010", ":6010" or "trainer.local"
+    :return: (str, int)
+    """
+    host, _, port = address.rpartition(":") if ":" in address else (address, ":", "")
+    return host, int(port) if port else PORT
+
+
+class Coordinator:
+    """
+    eval_genomes replacement that sends the genomes to workers that are connected over TCP
+    """
+
+    def __init__(self, address=("", PORT), batch_size=BATCH_SIZE, timeout=TIMEOUT, attempts=ATTEMPTS):
+        """
+        Initialize the coordinator and start listening for workers
+        :param address: (host, port) to listen on, port 0 picks a free port
+        :param batch_size: genomes per batch (int)
+        :param timeout: seconds a worker gets for a batch (float)
+        :param attempts: number of workers that may fail on the same batch before the training stops (int)
+        :return: None
+        """
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.attempts = attempts
+        self.listener = Listener(address, authkey=authkey())
+        self.address = self.listener.address
+
+        # Batches die nog naar een worker moeten: (generatie, nummer, genomes, seed, record, mislukte pogingen)
+        self.todo = queue.Queue()
+        self.done = threading.Condition()
+        self.results = {}
+        self.error = None
+        self.generation = 0
+        # (neat config, parallel.settings()), de workers spelen met de instellingen van de training
+        self.config = None
+        self.workers = 0
+        self.closed = False
+
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def accept(self):
+        """
+        accepts workers until the coordinator is closed, every worker gets its own thread
+        :return: None
+        """
+        while not self.closed:
+            try:
+                conn = self.listener.accept()
+            except (AuthenticationError, EOFError, OSError):
+                continue
+            if self.closed:
+                conn.close()
+                break
+            threading.Thread(target=self.serve, args=(conn, self.listener.last_accepted), daemon=True).start()
+
+    def serve(self, conn, address):
+        """
+        gives batches to one worker until it disconnects or the coordinator is closed
+        :param conn: Connection to the worker
+        :param address: address of the worker
+        :return: None
+        """
+        with self.done:
+            self.workers += 1
+        print("Worker {}:{} verbonden".format(*address))
+        config = None
+        batch = None
+        try:
+            while not self.closed:
+                try:
+                    batch = self.todo.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                generation, number, genomes, course_seed, record, failed = batch
+                # Een batch van een vorige generatie is al door een andere worker gespeeld
+                if generation != self.generation:
+                    batch = None
+                    continue
+
+                if config is not self.config:
+                    config = self.config
+                    conn.send(("config",) + config)
+                conn.send(("batch", (generation, number), genomes, course_seed, record))
+                if not conn.poll(self.timeout):
+                    print("Worker {}:{} reageert niet".format(*address))
+                    break
+                kind, key, result = conn.recv()
+
+                with self.done:
+                    if key[0] == self.generation:
+                        # Een fout in het spel zou bij elke worker opnieuw gebeuren, dus de generatie stopt
+                        if kind == "error":
+                            self.error = "worker {}:{} failed:\n{}".format(address[0], address[1], result)
+                        else:
+                            self.results.setdefault(key[1], result)
+                    self.done.notify_all()
+                batch = None
+        except (EOFError, OSError):
+            print("Worker {}:{} is weg".format(*address))
+        finally:
+            conn.close()
+            with self.done:
+                self.workers -= 1
+                # Het werk van een worker die weg is gaat naar een andere worker, tenzij het al te vaak mislukte
+                if batch is not None:
+                    if batch[5] + 1 >= self.attempts:
+                        self.error = "batch {} failed on {} workers, every worker was too late (more than {} s, " \
+                                     "see --cluster-timeout) or disconnected".format(batch[1], batch[5] + 1, self.timeout)
+                    else:
+                        self.todo.put(batch[:5] + (batch[5] + 1,))
+                self.done.notify_all()
+
+    def eval_genomes(self, genomes, config, course_seed=None):
+        """
+        sets the fitness of every genome, can be given to Population.run just like eval_genomes
+        :param genomes: list of (genome_id, genome) tuples
+        :param config: neat config
+        :param course_seed: seed of the course to play, None uses game.new_course
+        :return: None
+        """
+        game.gen += 1
+        genomes = [genome for genome_id, genome in genomes]
+        course_seed = game.new_course(course_seed).seed
+        record = bool(game.RECORD)
+        batches = [genomes[i:i + self.batch_size] for i in range(0, len(genomes), self.batch_size)]
+
+        settings = parallel.settings()
+        with self.done:
+            self.generation += 1
+            if self.config is None or self.config[0] is not config or self.config[1] != settings:
+                self.config = (config, settings)
+            self.results = {}
+            self.error = None
+        for number, batch in enumerate(batches):
+            self.todo.put((self.generation, number, batch, course_seed, record, 0))
+
+        waiting = False
+        with self.done:
+            while len(self.results) < len(batches):
+                if self.error is not None:
+                    # De batches die nog wachten horen bij een oude generatie zodra er een nieuwe begint
+                    raise RuntimeError(self.error)
+                if self.workers == 0 and not waiting:
+                    waiting = True
+                    print("Wachten op workers op poort {}...".format(self.address[1]))
+                self.done.wait(1)
+            results = [self.results[number] for number in range(len(batches))]
+
+        if record:
+            # De opnames van de batches worden weer een opname van de hele generatie
+            import replay
+            recorder = replay.Recorder(course_seed, game.gen)
+            for fitnesses, jumps in results:
+                recorder.jumps.extend(jumps)
+            recorder.save(replay.generation_file(game.RECORD, game.gen))
+            results = [fitnesses for fitnesses, jumps in results]
+
+        for batch, fitnesses in zip(batches, results):
+            for genome, fitness in zip(batch, fitnesses):
+                genome.fitness = fitness
+
+    def close(self):
+        """
+        stops listening and disconnects the workers, they wait for the next training
+        :return: None
+        """
+        if self.closed:
+            return
+        self.closed = True
+        # accept wacht op een verbinding, een lege verbinding maakt hem wakker
+        host, port = self.address
+        try:
+            socket.create_connection((host if host not in ("", "0.0.0.0") else "127.0.0.1", port), 1).close()
+        except OSError:
+            pass
+        self.listener.close()
+
+
+def work(address, forever=True):
+    """
+    plays the batches of a coordinator, runs on every worker machine
+    :param address: (host, port) of the coordinator
+    :param forever: connect again after the coordinator stops, for the next training (bool)
+    :return: number of played batches
+    """
+    played = 0
+    waiting = False
+    while True:
+        try:
+            conn = Client(address, authkey=authkey())
+        except OSError:
+            if not waiting:
+                print("Wachten op coordinator {}:{}...".format(*address))
+                waiting = True
+            time.sleep(1)
+            continue
+        print("Verbonden met coordinator {}:{}".format(*address))
+        waiting = False
+
+        config = settings = None
+        try:
+            while True:
+                message = conn.recv()
+                if message[0] == "config":
+                    kind, config, settings = message
+                elif message[0] == "batch":
+                    kind, key, genomes, course_seed, record = message
+                    try:
+                        result = parallel.eval_chunk(genomes, config, course_seed, record, settings)
+                    except Exception:
+                        # De worker blijft werken, de coordinator krijgt de fout te zien
+                        traceback.print_exc()
+                        conn.send(("error", key, traceback.format_exc()))
+                        continue
+                    conn.send(("result", key, result))
+                    played += 1
+        except (EOFError, OSError):
+            print("De coordinator is gestopt")
+        finally:
+            conn.close()
+
+        if not forever:
+            return played
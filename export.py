@@ -0,0 +1,154 @@
+"""
+Exports a game as a video or as a folder of PNG frames, without a window and faster than real time.
+The frames are drawn with the normal bestGameDraw and draw_window on a surface that is not on the
+screen. Writing the frames (PNG or a pipe to ffmpeg) happens on a background thread, so the game
+keeps drawing while the previous frames are being saved.
+
+    python flappy_bird_neat.py export --output clip.mp4 --seed 5              # the best bird
+    python flappy_bird_neat.py export replays/gen-0007.flr --output frames     # a recorded generation
+"""
+import os
+import queue
+import shutil
+import subprocess
+import threading
+
+import pygame
+
+import flappy_bird_neat as game
+import replay
+
+# bestGame en de training lopen op 100 frames per seconde
+GAME_FPS = 100
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".webm", ".avi", ".mov", ".gif")
+
+
+class FrameWriter:
+    """
+    saves frames on a background thread, as PNG files in a folder or as a video with ffmpeg
+    """
+
+    def __init__(self, output, size, fps=30, queue_size=64):
+        """
+        Initialize the writer and start the thread
+        :param output: a video file (for example clip.mp4) or a folder for PNG frames (str)
+        :param size: (width, height) of the frames
+        :param fps: frames per second of the video (int)
+        :param queue_size: maximum number of frames that wait for the thread (int)
+        :return: None
+        """
+        self.output = output
+        self.size = size
+        self.count = 0
+        self.error = None
+        self.process = None
+
+        if output.lower().endswith(VIDEO_EXTENSIONS):
+            ffmpeg = shutil.which("ffmpeg")
+            if ffmpeg is None:
+                raise RuntimeError("ffmpeg is needed to export a video, export to a folder to get PNG frames")
+            # ffmpeg krijgt de ruwe RGB pixels van elke frame via stdin
+            self.process = subprocess.Popen(
+                [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                 "-s", "{}x{}".format(*size), "-r", str(fps), "-i", "-",
+                 "-pix_fmt", "yuv420p", output],
+                stdin=subprocess.PIPE)
+        else:
+            os.makedirs(output, exist_ok=True)
+
+        # Als de thread achterloopt wacht write pas als er queue_size frames klaarstaan, zo blijft het geheugen beperkt
+        self.queue = queue.Queue(queue_size)
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, surface):
+        """
+        adds a frame, the pixels are copied so the surface can be drawn on again right away
+        :param surface: pygame surface with the size of the writer
+        :return: None
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put((self.count, pygame.image.tobytes(surface, "RGB")))
+        self.count += 1
+
+    def work(self):
+        """
+        the loop of the background thread
+        :return: None
+        """
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue
+            number, pixels = item
+            try:
+                if self.process is not None:
+                    self.process.stdin.write(pixels)
+                else:
+                    frame = pygame.image.frombytes(pixels, self.size, "RGB")
+                    pygame.image.save(frame, os.path.join(self.output, "frame-{:05d}.png".format(number)))
+            except (OSError, pygame.error) as e:
+                self.error = e
+
+    def close(self):
+        """
+        waits until every frame is saved
+        :return: None
+        """
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        if self.process is not None:
+            self.process.stdin.close()
+            if self.process.wait() != 0 and self.error is None:
+                self.error = RuntimeError("ffmpeg failed with exit code {}".format(self.process.returncode))
+        if self.error is not None:
+            raise self.error
+
+
+def record_game(net, seed=None, max_score=None):
+    """
+    lets a network play a course without a screen and records it
+    :param net: network with an activate method
+    :param seed: seed of the course, None gives a random course (int)
+    :param max_score: None uses game.MAX_SCORE (int)
+    :return: Replay
+    """
+    course = game.Course(seed)
+    recorder = replay.Recorder(course.seed)
+    game.play_headless(net, course, max_score, recorder)
+    return recorder.replay()
+
+
+def export(recording, output, fps=30, speed=1.0):
+    """
+    draws every frame of a replay on a surface that is not on the screen and saves it
+    :param recording: Replay
+    :param output: a video file or a folder for PNG frames (str)
+    :param fps: frames per second of the video (int)
+    :param speed: 1 is real time, 2 is twice as fast (float)
+    :return: number of saved frames
+    """
+    surface = pygame.Surface((game.WIN_WIDTH, game.WIN_HEIGHT))
+    player = replay.Player(recording)
+    step = speed * GAME_FPS / fps
+
+    with FrameWriter(output, surface.get_size(), fps) as writer:
+        position = 0.0
+        while position <= len(recording):
+            player.seek(int(position))
+            player.draw(surface)
+            writer.write(surface)
+            position += step
+    return writer.count
@@ -0,0 +1,113 @@
+"""
+Remembers the fitness of genomes, so genomes that are copied unchanged into the next generation
+(elitism) don't have to play the same course again. The cache is keyed on a hash of everything
+that makes up the network of a genome plus the seed of the course it played.
+"""
+import collections
+import hashlib
+
+import flappy_bird_neat as game
+
+
+def genome_hash(genome):
+    """
+    hash of the network of a genome: its nodes and enabled connections with all their values.
+    Genomes with the same hash always play the same game on the same course.
+    :param genome: neat genome
+    :return: str
+    """
+    nodes = sorted((key, repr(ng.bias), repr(ng.response), ng.activation, ng.aggregation)
+                   for key, ng in genome.nodes.items())
+    connections = sorted((key, repr(cg.weight)) for key, cg in genome.connections.items() if cg.enabled)
+    return hashlib.sha1(repr((nodes, connections)).encode()).hexdigest()
+
+
+class FitnessCache:
+    """
+    least-recently-used cache of fitness values with a maximum size
+    """
+
+    def __init__(self, maxsize=10000):
+        """
+        Initialize an empty cache
+        :param maxsize: maximum number of fitness values (int)
+        :return: None
+        """
+        self.maxsize = maxsize
+        self.values = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, key):
+        """
+        gets a fitness value and marks it as recently used
+        :param key: (genome hash, course seed)
+        :return: the fitness, or None if it isn't in the cache
+        """
+        fitness = self.values.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.values.move_to_end(key)
+        return fitness
+
+    def put(self, key, fitness):
+        """
+        stores a fitness value, the least recently used value is removed when the cache is full
+        :param key: (genome hash, course seed)
+        :param fitness: float
+        :return: None
+        """
+        self.values[key] = fitness
+        self.values.move_to_end(key)
+        while len(self.values) > self.maxsize:
+            self.values.popitem(last=False)
+
+
+class CachedEvaluator:
+    """
+    wraps an eval_genomes function, only genomes that aren't in the cache are evaluated
+    """
+
+    def __init__(self, eval_function, maxsize=10000):
+        """
+        Initialize the evaluator
+        :param eval_function: eval_genomes(genomes, config, course_seed) function to wrap
+        :param maxsize: maximum size of the cache (int)
+        :return: None
+        """
+        self.eval_function = eval_function
+        self.cache = FitnessCache(maxsize)
+
+    def eval_genomes(self, genomes, config):
+        """
+        sets the fitness of every genome, can be given to Population.run just like eval_genomes
+        :param genomes: list of (genome_id, genome) tuples
+        :param config: neat config
+        :return: None
+        """
+        # Alle genomes van deze generatie spelen dezelfde baan, ook de genomes die uit de cache komen
+        course_seed = game.new_course().seed
+
+        todo = []
+        keys = {}
+        for genome_id, genome in genomes:
+            key = (genome_hash(genome), course_seed)
+            fitness = self.cache.get(key)
+            if fitness is None:
+                todo.append((genome_id, genome))
+                keys[genome_id] = key
+            else:
+                genome.fitness = fitness
+
+        if todo:
+            self.eval_function(todo, config, course_seed)
+            for genome_id, genome in todo:
+                self.cache.put(keys[genome_id], genome.fitness)
+        else:
+            # De eval functie telt normaal de generaties, nu wordt hij niet aangeroepen
+            game.gen += 1
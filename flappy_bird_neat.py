@@ -10,31 +10,268 @@ import random
 import os
 import neat
 import pickle
-pygame.font.init()  # init font
+import sys
+import time
+from telemetry import PhaseTimer, TelemetryReporter
+import champion
+import json
 
 WIN_WIDTH = 600
 WIN_HEIGHT = 800
 FLOOR = 730
-STAT_FONT = pygame.font.SysFont("comicsans", 50)
-END_FONT = pygame.font.SysFont("comicsans", 70)
 DRAW_LINES = False
+IMG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "imgs")
+
+# Deze instellingen kunnen via de command line aangepast worden, zie main() en python flappy_bird_neat.py --help
+# Met --headless (of FLAPPY_HEADLESS=1) wordt er getraind zonder scherm, zonder fps limiet en zonder tekenen
+HEADLESS = os.environ.get("FLAPPY_HEADLESS") == "1"
+
+# Met --vectorized wordt de hele generatie tegelijk gesimuleerd met numpy arrays (zie population.py), altijd zonder scherm
+VECTORIZED = False
+
+# Met --workers N wordt elke generatie over N processen verdeeld (zie parallel.py), ook altijd zonder scherm
+WORKERS = 0
+# Met --cluster HOST:PORT wacht de training op workers op andere machines (zie cluster.py), ook altijd zonder scherm
+CLUSTER = None
+# Met --cluster-timeout S krijgt een worker S seconden voor een batch, daarna krijgt een andere worker hem
+CLUSTER_TIMEOUT = 60
+
+# Met --render-every N wordt tijdens het trainen maar elke N-de frame getekend, de simulatie gaat dan N keer zo snel
+RENDER_EVERY = 1
+# Met de F toets gaat het trainen in fast-forward: geen fps limiet en maar RENDER_FPS keer per seconde tekenen
+RENDER_FPS = 30
+fast_forward = False
+
+# De tijd van elke fase van een frame wordt hierin opgeteld, met --telemetry FILE wordt dit per generatie opgeslagen
+profiler = PhaseTimer()
+TELEMETRY = None
+
+# Met --seed N is een hele run (pijpen en NEAT) opnieuw af te spelen
+SEED = None
+# Met --course-seed N speelt elke generatie dezelfde baan, in plaats van elke generatie een nieuwe
+COURSE_SEED = None
+# Met --fitness-cache N wordt de fitness van maximaal N genomes onthouden (zie fitness_cache.py)
+FITNESS_CACHE = 0
+# Met --halving N speelt elke generatie in maximaal N rondes van successive halving op steeds meer banen (zie halving.py)
+HALVING = 0
+HALVING_COURSES = 1
+HALVING_KEEP = 0.5
+HALVING_BUDGET = None
+
+# Elke CHECKPOINT_EVERY generaties wordt de training opgeslagen in CHECKPOINT_DIR, met --resume gaat de training verder vanaf de laatste checkpoint
+CHECKPOINT_DIR = "checkpoints"
+CHECKPOINT_EVERY = 5
+RESUME = False
+
+# Met --collision gap botsen de vogels tijdens het trainen met hit-boxes in plaats van masks (zie hitbox.py), bestGame gebruikt altijd masks
+COLLISION = "mask"
+
+# Met --record DIR wordt elke gespeelde generatie en elk spel van de beste vogel opgenomen in DIR (zie replay.py)
+RECORD = None
+
+# Met --live NAME publiceert de training elke frame in shared memory, met watch --live NAME kan een ander proces meekijken (zie live.py)
+LIVE = None
+live_publisher = None
+
+# Het maximaal aantal generaties per training en de score waarbij een vogel klaar is
+GENERATIONS = 50
+MAX_SCORE = 150
+
+class Assets:
+    """
+    the window, images and fonts of the game, each is only created the first time it is used.
+    Importing this module (in a worker process, test or benchmark) opens no window and decodes no
+    images, and training without a screen never opens a window at all.
+    """
+
+    def __init__(self):
+        """
+        Initialize the object, nothing is loaded yet
+        :return: None
+        """
+        self._win = None
+        self._images = None
+        self._fonts = None
+        self._labels = {}
+        # De Asset class attributes die de plaatjes krijgen zodra ze geladen zijn
+        self._bound = []
+
+    @property
+    def win(self):
+        """
+        the pygame window, opened the first time it is used
+        :return: pygame surface
+        """
+        if self._win is None:
+            self._win = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
+            pygame.display.set_caption("Flappy Bird")
+            # Met een scherm kunnen de plaatjes met convert_alpha geladen worden, dan tekenen ze sneller
+            if self._images is not None:
+                self.load()
+        return self._win
+
+    def image(self, name):
+        """
+        gets a loaded image, the first call loads all images
+        :param name: "pipe", "pipe_top", "bg", "birds" or "base"
+        :return: pygame surface (list of surfaces for "birds")
+        """
+        if self._images is None:
+            self.load()
+        return self._images[name]
+
+    def load(self):
+        """
+        loads all images and puts them on the classes that use them with Asset
+        :return: None
+        """
+        self._images = self.load_images()
+        # De masks, gedraaide plaatjes en hit-boxes van de oude plaatjes worden nooit meer gebruikt
+        mask_cache.clear()
+        rotate_cache.clear()
+        if "hitbox" in sys.modules:
+            sys.modules["hitbox"].hitbox_cache.clear()
+        for asset in self._bound:
+            setattr(asset.owner, asset.attr_name, asset.value(self._images))
+
+    def load_images(self):
+        """
+        loads and scales all images, convert_alpha is only possible when there is a window
+        :return: dict with the images
+        """
+        def load(name, convert=True):
+            img = pygame.image.load(os.path.join(IMG_DIR, name))
+            if convert and pygame.display.get_surface() is not None:
+                img = img.convert_alpha()
+            return img
+
+        pipe_img = pygame.transform.scale2x(load("pipe.png"))
+        return {
+            "pipe": pipe_img,
+            "pipe_top": pygame.transform.flip(pipe_img, False, True),
+            "bg": pygame.transform.scale(load("bg.png"), (600, 900)),
+            "birds": [pygame.transform.scale2x(load("bird" + str(x) + ".png", convert=False)) for x in range(1,4)],
+            "base": pygame.transform.scale2x(load("base.png")),
+        }
+
+    def font(self, name):
+        """
+        gets a font, the first call initializes pygame.font and creates the fonts
+        :param name: "stat" or "end"
+        :return: pygame Font
+        """
+        if self._fonts is None:
+            pygame.font.init()  # init font
+            self._fonts = {
+                "stat": pygame.font.SysFont("comicsans", 50),
+                "end": pygame.font.SysFont("comicsans", 70),
+            }
+        return self._fonts[name]
+
+    def label(self, key, text, font="stat", color=(255,255,255)):
+        """
+        gets a rendered text, it is only rendered again when the text of the label changes
+        :param key: name of the label, for example "score"
+        :param text: str
+        :param font: name of the font
+        :param color: (r, g, b)
+        :return: pygame surface
+        """
+        cached = self._labels.get(key)
+        if cached is None or cached[0] != (text, font, color):
+            cached = ((text, font, color), self.font(font).render(text, 1, color))
+            self._labels[key] = cached
+        return cached[1]
+
+
+assets = Assets()
+
+
+class Asset:
+    """
+    class attribute that gets its value from assets when it is used. After the images are loaded
+    assets replaces it with the image itself, so all objects of the class share one image that
+    costs nothing to look up.
+    """
+
+    def __init__(self, name, attr=None):
+        """
+        :param name: name of the image in Assets
+        :param attr: optional method of the image to call, for example "get_width"
+        """
+        self.name = name
+        self.attr = attr
+        self.owner = None
+        self.attr_name = None
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.attr_name = name
+        assets._bound.append(self)
 
-WIN = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
-pygame.display.set_caption("Flappy Bird")
+    def value(self, images):
+        """
+        the value of the attribute
+        :param images: dict with the loaded images
+        :return: pygame surface, or the result of attr
+        """
+        value = images[self.name]
+        if self.attr is not None:
+            value = getattr(value, self.attr)()
+        return value
+
+    def __get__(self, obj, owner=None):
+        # Alleen het eerste gebruik komt hier, daarna staat het plaatje zelf op de class
+        assets.image(self.name)
+        return self.value(assets._images)
+
+
+# De oude namen van het scherm, de plaatjes en de fonts werken nog steeds, maar worden nu pas geladen als ze gebruikt worden
+LAZY_NAMES = {
+    "WIN": lambda: assets.win,
+    "pipe_img": lambda: assets.image("pipe"),
+    "pipe_top_img": lambda: assets.image("pipe_top"),
+    "bg_img": lambda: assets.image("bg"),
+    "bird_images": lambda: assets.image("birds"),
+    "base_img": lambda: assets.image("base"),
+    "STAT_FONT": lambda: assets.font("stat"),
+    "END_FONT": lambda: assets.font("end"),
+}
+
+def __getattr__(name):
+    if name in LAZY_NAMES:
+        return LAZY_NAMES[name]()
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
-pipe_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs","pipe.png")).convert_alpha())
-bg_img = pygame.transform.scale(pygame.image.load(os.path.join("imgs","bg.png")).convert_alpha(), (600, 900))
-bird_images = [pygame.transform.scale2x(pygame.image.load(os.path.join("imgs","bird" + str(x) + ".png"))) for x in range(1,4)]
-base_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs","base.png")).convert_alpha())
 
 gen = 0
 
+# Per plaatje wordt de mask maar een keer aangemaakt en daarna hergebruikt
+mask_cache = {}
+
+def get_mask(img):
+    """
+    gets the (cached) collision mask of an image
+    :param img: pygame surface
+    :return: pygame Mask
+    """
+    mask = mask_cache.get(img)
+    if mask is None:
+        mask = pygame.mask.from_surface(img)
+        mask_cache[img] = mask
+    return mask
+
+# Per plaatje en hoek wordt de gedraaide versie maar een keer aangemaakt en daarna hergebruikt
+rotate_cache = {}
+
 class Bird:
     """
     Bird class representing the flappy bird
     """
+    # Geen __dict__ per vogel, de plaatjes zijn van de class en worden door alle vogels gedeeld
+    __slots__ = ("x", "y", "tilt", "tick_count", "vel", "height", "img_count", "img")
     MAX_ROTATION = 25
-    IMGS = bird_images
+    IMGS = Asset("birds")
     ROT_VEL = 20
     ANIMATION_TIME = 5
 
@@ -93,7 +330,7 @@ class Bird:
         """
         draw the bird
         :param win: pygame window or surface
-        :return: None
+        :return: the rect that was drawn on
         """
         self.img_count += 1
 
@@ -117,29 +354,73 @@ class Bird:
 
 
         # tilt the bird
-        blitRotateCenter(win, self.img, (self.x, self.y), self.tilt)
+        return blitRotateCenter(win, self.img, (self.x, self.y), self.tilt)
 
     def get_mask(self):
         """
         gets the mask for the current image of the bird
         :return: None
         """
-        return pygame.mask.from_surface(self.img)
+        return get_mask(self.img)
+
+
+class Course:
+    """
+    the heights of all pipes of one game, generated from a seed
+    """
+    MIN_HEIGHT = 50
+    MAX_HEIGHT = 450
+    BLOCK = 64
+
+    def __init__(self, seed=None):
+        """
+        Initialize the course
+        :param seed: seed of the course, None draws one from the global random (int)
+        :return: None
+        """
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.heights = []
+
+    def __getitem__(self, i):
+        """
+        height of pipe number i, the heights are generated in blocks when they are needed
+        :param i: int
+        :return: int
+        """
+        while len(self.heights) <= i:
+            self.heights.extend(self.rng.randrange(self.MIN_HEIGHT, self.MAX_HEIGHT) for _ in range(self.BLOCK))
+        return self.heights[i]
+
+
+def new_course(seed=None):
+    """
+    the course of a generation: the given seed, else the --course-seed, else a random course
+    :param seed: int
+    :return: Course
+    """
+    return Course(COURSE_SEED if seed is None else seed)
 
 
 class Pipe():
     """
     represents a pipe object
     """
+    __slots__ = ("x", "height", "top", "bottom", "passed")
     GAP = 160
     # Verandert van 200 naar 160 voor ruimte tussen buizen
     VEL = 5
+    # De plaatjes worden een keer geladen (en omgedraaid) en door alle pijpen gedeeld
+    PIPE_TOP = Asset("pipe_top")
+    PIPE_BOTTOM = Asset("pipe")
 
-    def __init__(self, x):
+    def __init__(self, x, height):
         """
         initialize pipe object
         :param x: int
-        :param y: int
+        :param height: height of the gap, from the top of the screen (int)
         :return" None
         """
         self.x = x
@@ -149,19 +430,28 @@ class Pipe():
         self.top = 0
         self.bottom = 0
 
-        self.PIPE_TOP = pygame.transform.flip(pipe_img, False, True)
-        self.PIPE_BOTTOM = pipe_img
-
         self.passed = False
 
-        self.set_height()
+        self.set_height(height)
+
+    def reset(self, x, height):
+        """
+        turns the pipe into a new pipe, so a Pipe object can be used again
+        :param x: int
+        :param height: height of the gap, from the top of the screen (int)
+        :return: None
+        """
+        self.x = x
+        self.passed = False
+        self.set_height(height)
 
-    def set_height(self):
+    def set_height(self, height):
         """
         set the height of the pipe, from the top of the screen
+        :param height: int
         :return: None
         """
-        self.height = random.randrange(50, 450)
+        self.height = height
         self.top = self.height - self.PIPE_TOP.get_height()
         self.bottom = self.height + self.GAP
 
@@ -176,12 +466,12 @@ class Pipe():
         """
         draw both the top and bottom of the pipe
         :param win: pygame window/surface
-        :return: None
+        :return: the rect that was drawn on
         """
         # draw top
-        win.blit(self.PIPE_TOP, (self.x, self.top))
+        rect = win.blit(self.PIPE_TOP, (self.x, self.top))
         # draw bottom
-        win.blit(self.PIPE_BOTTOM, (self.x, self.bottom))
+        return rect.union(win.blit(self.PIPE_BOTTOM, (self.x, self.bottom)))
 
 
     def collide(self, bird, win):
@@ -190,9 +480,15 @@ class Pipe():
         :param bird: Bird object
         :return: Bool
         """
+        # Eerst een snelle check met rechthoeken, als die elkaar niet raken kunnen de masks elkaar ook niet raken
+        bird_rect = bird.img.get_rect(topleft = (bird.x, round(bird.y)))
+        if not bird_rect.colliderect(self.PIPE_TOP.get_rect(topleft = (self.x, self.top))) and \
+                not bird_rect.colliderect(self.PIPE_BOTTOM.get_rect(topleft = (self.x, self.bottom))):
+            return False
+
         bird_mask = bird.get_mask()
-        top_mask = pygame.mask.from_surface(self.PIPE_TOP)
-        bottom_mask = pygame.mask.from_surface(self.PIPE_BOTTOM)
+        top_mask = get_mask(self.PIPE_TOP)
+        bottom_mask = get_mask(self.PIPE_BOTTOM)
         top_offset = (self.x - bird.x, self.top - round(bird.y))
         bottom_offset = (self.x - bird.x, self.bottom - round(bird.y))
 
@@ -204,13 +500,95 @@ class Pipe():
 
         return False
 
+
+class Pipes:
+    """
+    the pipes of a game in a ring buffer with a fixed number of Pipe objects. There are never more
+    than a few pipes on the screen and they leave the screen in the order they came in, so a new
+    pipe reuses the Pipe object of a pipe that is gone and a game never allocates new pipes.
+    """
+    __slots__ = ("ring", "first", "count")
+    # Er staan hooguit drie pijpen tegelijk op het scherm
+    SIZE = 4
+
+    def __init__(self, x=None, height=None, size=SIZE):
+        """
+        Initialize the ring, with the first pipe if x and height are given
+        :param x: x pos of the first pipe (int)
+        :param height: height of the gap of the first pipe (int)
+        :param size: maximum number of pipes at the same time (int)
+        :return: None
+        """
+        self.ring = [None] * size
+        self.first = 0
+        self.count = 0
+        if height is not None:
+            self.append(x, height)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        size = len(self.ring)
+        for i in range(self.count):
+            yield self.ring[(self.first + i) % size]
+
+    def __getitem__(self, index):
+        """
+        the pipe at a place, 0 is the pipe that came first, -1 the newest
+        :param index: int or slice
+        :return: Pipe, or a list of pipes for a slice
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("pipe index out of range")
+        return self.ring[(self.first + index) % len(self.ring)]
+
+    def append(self, x, height):
+        """
+        adds a new pipe after the others, in the Pipe object of a pipe that is gone
+        :param x: int
+        :param height: height of the gap, from the top of the screen (int)
+        :return: the new Pipe
+        """
+        if self.count == len(self.ring):
+            raise IndexError("more than {} pipes at the same time".format(len(self.ring)))
+        i = (self.first + self.count) % len(self.ring)
+        pipe = self.ring[i]
+        if pipe is None:
+            pipe = self.ring[i] = Pipe(x, height)
+        else:
+            pipe.reset(x, height)
+        self.count += 1
+        return pipe
+
+    def drop(self, count=1):
+        """
+        removes the pipes that came first, their Pipe objects are used again by append
+        :param count: number of pipes to remove (int)
+        :return: None
+        """
+        count = min(count, self.count)
+        self.first = (self.first + count) % len(self.ring)
+        self.count -= count
+
+    def clear(self):
+        """
+        removes all pipes
+        :return: None
+        """
+        self.drop(self.count)
+
 class Base:
     """
     Represents the moving floor of the game
     """
     VEL = 5
-    WIDTH = base_img.get_width()
-    IMG = base_img
+    WIDTH = Asset("base", "get_width")
+    IMG = Asset("base")
 
     def __init__(self, y):
         """
@@ -239,10 +617,67 @@ class Base:
         """
         Draw the floor. This is two images that move together.
         :param win: the pygame surface/window
+        :return: the rect that was drawn on
+        """
+        rect = win.blit(self.IMG, (self.x1, self.y))
+        return rect.union(win.blit(self.IMG, (self.x2, self.y)))
+
+
+class Flock:
+    """
+    the birds of one generation with their networks and genomes, every bird keeps
+    its own slot in the lists so dead birds never have to be searched for or removed
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty flock
         :return: None
         """
-        win.blit(self.IMG, (self.x1, self.y))
-        win.blit(self.IMG, (self.x2, self.y))
+        self.birds = []
+        self.nets = []
+        self.genomes = []
+        self.alive = []
+        self.count = 0
+
+    def __len__(self):
+        """
+        number of living birds
+        :return: int
+        """
+        return self.count
+
+    def add(self, bird, net, genome):
+        """
+        add a living bird to a new slot
+        :param bird: Bird object
+        :param net: neural network of the bird
+        :param genome: genome of the bird
+        :return: the slot of the bird (int)
+        """
+        self.birds.append(bird)
+        self.nets.append(net)
+        self.genomes.append(genome)
+        self.alive.append(True)
+        self.count += 1
+        return len(self.birds) - 1
+
+    def kill(self, slot):
+        """
+        mark the bird in a slot as dead
+        :param slot: int
+        :return: None
+        """
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.count -= 1
+
+    def living(self):
+        """
+        slots of the living birds, as a new list so birds can be killed while looping over it
+        :return: list of ints
+        """
+        return [slot for slot, alive in enumerate(self.alive) if alive]
 
 
 def blitRotateCenter(surf, image, topleft, angle):
@@ -252,19 +687,84 @@ def blitRotateCenter(surf, image, topleft, angle):
     :param image: the image surface to rotate
     :param topLeft: the top left position of the image
     :param angle: a float value for angle
-    :return: None
+    :return: the rect that was drawn on
     """
-    rotated_image = pygame.transform.rotate(image, angle)
+    # De tilt van een vogel heeft maar een paar waardes, dus elke gedraaide versie van een plaatje wordt maar een keer gemaakt
+    rotated_image = rotate_cache.get((image, angle))
+    if rotated_image is None:
+        rotated_image = pygame.transform.rotate(image, angle)
+        rotate_cache[(image, angle)] = rotated_image
     new_rect = rotated_image.get_rect(center = image.get_rect(topleft = topleft).center)
 
-    surf.blit(rotated_image, new_rect.topleft)
+    return surf.blit(rotated_image, new_rect.topleft)
+
+
+class DirtyRects:
+    """
+    remembers where the sprites were drawn in the previous frame. Only there the background has to
+    be drawn again, and only the regions that changed have to be sent to the screen
+    """
+
+    def __init__(self):
+        """
+        Initialize the object, the first frame is always drawn completely
+        :return: None
+        """
+        self.surface = None
+        self.previous = []
+        self.current = []
+
+    def reset(self):
+        """
+        draw the next frame completely, for example when the window was hidden
+        :return: None
+        """
+        self.surface = None
+
+    def begin(self, win, background):
+        """
+        erases the sprites of the previous frame by drawing the background over them
+        :param win: pygame window or surface
+        :param background: pygame surface
+        :return: None
+        """
+        if win is not self.surface:
+            # Een nieuw scherm of surface wordt een keer helemaal getekend
+            self.surface = win
+            self.previous = [win.blit(background, (0,0))]
+        else:
+            for rect in self.previous:
+                win.blit(background, rect, rect)
+        self.current = []
+
+    def add(self, rect):
+        """
+        marks a region that was drawn on in this frame
+        :param rect: pygame Rect
+        :return: None
+        """
+        self.current.append(rect)
+
+    def end(self, win):
+        """
+        updates the changed regions on the screen, nothing is updated when drawing on a surface without a screen
+        :param win: pygame window or surface
+        :return: None
+        """
+        if win is pygame.display.get_surface():
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
+
+
+# Alleen de plekken waar iets bewogen heeft worden opnieuw getekend en naar het scherm gestuurd
+dirty_rects = DirtyRects()
 
 def draw_window(win, birds, pipes, base, score, gen, pipe_ind):
     """
     draws the windows for the main game loop
     :param win: pygame window surface
     :param bird: a Bird object
-    :param pipes: List of pipes
+    :param pipes: Pipes with the pipes on the screen
     :param score: score of the game (int)
     :param gen: current generation
     :param pipe_ind: index of closest pipe
@@ -272,132 +772,179 @@ def draw_window(win, birds, pipes, base, score, gen, pipe_ind):
     """
     if gen == 0:
         gen = 1
-    win.blit(bg_img, (0,0))
+    dirty_rects.begin(win, assets.image("bg"))
 
     for pipe in pipes:
-        pipe.draw(win)
+        dirty_rects.add(pipe.draw(win))
 
-    base.draw(win)
+    dirty_rects.add(base.draw(win))
+    # Alle vogels hebben dezelfde x, een rect om alle vogels samen is sneller dan een rect per vogel
+    birds_rect = None
     for bird in birds:
         # draw lines from bird to pipe
         if DRAW_LINES:
             try:
-                pygame.draw.line(win, (255,0,0), (bird.x+bird.img.get_width()/2, bird.y + bird.img.get_height()/2), (pipes[pipe_ind].x + pipes[pipe_ind].PIPE_TOP.get_width()/2, pipes[pipe_ind].height), 5)
-                pygame.draw.line(win, (255,0,0), (bird.x+bird.img.get_width()/2, bird.y + bird.img.get_height()/2), (pipes[pipe_ind].x + pipes[pipe_ind].PIPE_BOTTOM.get_width()/2, pipes[pipe_ind].bottom), 5)
+                dirty_rects.add(pygame.draw.line(win, (255,0,0), (bird.x+bird.img.get_width()/2, bird.y + bird.img.get_height()/2), (pipes[pipe_ind].x + pipes[pipe_ind].PIPE_TOP.get_width()/2, pipes[pipe_ind].height), 5))
+                dirty_rects.add(pygame.draw.line(win, (255,0,0), (bird.x+bird.img.get_width()/2, bird.y + bird.img.get_height()/2), (pipes[pipe_ind].x + pipes[pipe_ind].PIPE_BOTTOM.get_width()/2, pipes[pipe_ind].bottom), 5))
             except:
                 pass
         # draw bird
-        bird.draw(win)
+        rect = bird.draw(win)
+        birds_rect = rect if birds_rect is None else birds_rect.union(rect)
+    if birds_rect is not None:
+        dirty_rects.add(birds_rect)
 
-    # score
-    score_label = STAT_FONT.render("Score: " + str(score),1,(255,255,255))
-    win.blit(score_label, (WIN_WIDTH - score_label.get_width() - 15, 10))
+    # score, de teksten worden alleen opnieuw gerenderd als de waarde verandert
+    score_label = assets.label("score", "Score: " + str(score))
+    dirty_rects.add(win.blit(score_label, (WIN_WIDTH - score_label.get_width() - 15, 10)))
 
     # generations
-    score_label = STAT_FONT.render("Gens: " + str(gen-1),1,(255,255,255))
-    win.blit(score_label, (10, 10))
+    score_label = assets.label("gens", "Gens: " + str(gen-1))
+    dirty_rects.add(win.blit(score_label, (10, 10)))
 
     # alive
-    score_label = STAT_FONT.render("Alive: " + str(len(birds)),1,(255,255,255))
-    win.blit(score_label, (10, 50))
+    score_label = assets.label("alive", "Alive: " + str(len(birds)))
+    dirty_rects.add(win.blit(score_label, (10, 50)))
 
-    pygame.display.update()
+    # Alleen de veranderde plekken gaan naar het scherm, bij een export zonder scherm niets
+    dirty_rects.end(win)
 
 # Deze functie evalueert de vogels en geeft ze een fitness score
-def eval_genomes(genomes, config):
+def eval_genomes(genomes, config, course_seed=None):
     """
     runs the simulation of the current population of
     birds and sets their fitness based on the distance they
     reach in the game.
+    :param course_seed: seed of the course to play, None uses new_course
     """
     # win is vereist voor pygame
-    global WIN, gen
-    win = WIN
+    global gen, fast_forward
+    # Zonder scherm wordt er nooit een window geopend
+    win = None if HEADLESS else assets.win
     # Elke keer dat een nieuwe generatie getest wordt gaat dit 1 omhoog
     gen += 1
 
-    # In deze arrays worden de netwerken, vogels en genomes opgeslagen met een index, zo hoort de net bij index 1 bij het vogeltje op index 1 en het genome op index 1
-    nets = []
-    birds = []
-    ge = []
+    # In de flock worden de netwerken, vogels en genomes opgeslagen met een vaste index (slot), zo hoort de net in slot 1 bij het vogeltje in slot 1 en het genome in slot 1
+    flock = Flock()
 
-    # Deze for loop maakt vogels, netwerken en de fitness van genomes aan en zet ze in de correcte array
+    # Deze for loop maakt vogels, netwerken en de fitness van genomes aan en zet ze in de flock
     for genome_id, genome in genomes:
         genome.fitness = 0
         # In de variabele net wordt een netwerk opgeslagen met de genome en config als blauwdruk opgeslagen
         net = neat.nn.FeedForwardNetwork.create(genome, config)
-        nets.append(net)
-        birds.append(Bird(230,350))
-        ge.append(genome)
+        flock.add(Bird(230,350), net, genome)
+    birds, nets, ge = flock.birds, flock.nets, flock.genomes
 
-    # In deze variabele worden de vloer (base), pijpen en score opgeslagen
+    # In deze variabele worden de vloer (base), pijpen en score opgeslagen, de hoogtes van de pijpen komen uit de baan (course)
+    course = new_course(course_seed)
     base = Base(FLOOR)
-    pipes = [Pipe(700)]
+    pipes = Pipes(700, course[0])
     score = 0
 
+    # Met --record worden de sprongen van elke vogel opgenomen
+    recorder = None
+    if RECORD:
+        import replay
+        recorder = replay.Recorder(course.seed, gen)
+
+    # Botsingen met pixel perfecte masks, of met de snellere hit-boxes
+    collide = Pipe.collide
+    if COLLISION == "gap":
+        import hitbox
+        collide = hitbox.collide
+
     # Dit is een object dat de verlopen tijd per frame bijhoudt
     clock = pygame.time.Clock()
+    frame = 0
+    last_draw = 0
 
     run = True
     # Deze while loop bevat de main game loop en blijft lopen zolang run true is en er vogeltjes over zijn
-    while run and len(birds) > 0:
-        # Dit stelt een limiet op het maximum fps met behulp van de verlopen tijd sinds het vorige frame
-        clock.tick(100)
-        # Verandert van 60 naar 100 voor meer fps
-
-        # Als de app gesloten wordt zorgt deze code ervoor dat ook alles van pygame sluit
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-                pygame.quit()
-                quit()
-                break
-
+    while run and len(flock) > 0:
+        # Alleen frames die getekend worden hebben een fps limiet en handelen events af, zonder scherm wordt er nooit getekend
+        frame += 1
+        if HEADLESS:
+            draw = False
+        elif fast_forward:
+            draw = time.perf_counter() - last_draw >= 1 / RENDER_FPS
+        else:
+            draw = frame % RENDER_EVERY == 0
+
+        if draw:
+            last_draw = time.perf_counter()
+            if not fast_forward:
+                # Dit stelt een limiet op het maximum fps met behulp van de verlopen tijd sinds het vorige frame
+                clock.tick(100)
+                # Verandert van 60 naar 100 voor meer fps
+
+            for event in pygame.event.get():
+                # Als de app gesloten wordt zorgt deze code ervoor dat ook alles van pygame sluit
+                if event.type == pygame.QUIT:
+                    run = False
+                    pygame.quit()
+                    quit()
+                    break
+
+                # Met de F toets gaat fast-forward aan of uit
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+                    fast_forward = not fast_forward
+
+                # Als het scherm weer zichtbaar wordt moet alles opnieuw getekend worden
+                if event.type == pygame.VIDEOEXPOSE:
+                    dirty_rects.reset()
+
+        # Vanaf hier wordt de tijd van elke fase van de frame bijgehouden
+        t = profiler.frame(len(flock))
         
         pipe_ind = 0
-        # Als er nog vogels leven
-        if len(birds) > 0:
-            # Als er een pijp in de pipes array zit en het vogeltje voorbij de pijp is, dan wordt vanaf hier naar de volgende pijp in de array gekeken door middel van pipe_ind
-            if len(pipes) > 1 and birds[0].x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
-                pipe_ind = 1
-
-        # Leest de vogels met hun index af uit de birds array
-        for x, bird in enumerate(birds):
+        # Als er een pijp in de pipes array zit en de vogeltjes voorbij de pijp zijn, dan wordt vanaf hier naar de volgende pijp in de array gekeken door middel van pipe_ind
+        if len(pipes) > 1 and birds[0].x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
+            pipe_ind = 1
+
+        # Leest de slots van de levende vogels af uit de flock
+        living = flock.living()
+        for x in living:
             # Verhoogt de fitness van alle nog levende vogels en beweegt ze
             ge[x].fitness += 0.1
-            bird.move()
+            birds[x].move()
+        t = profiler.add("physics", t)
 
+        for x in living:
+            bird = birds[x]
             # Geeft data aan het neural net en slaat de uitvoer op
-            output = nets[birds.index(bird)].activate((bird.y, abs(bird.y - pipes[pipe_ind].height), abs(bird.y - pipes[pipe_ind].bottom)))
+            output = nets[x].activate((bird.y, abs(bird.y - pipes[pipe_ind].height), abs(bird.y - pipes[pipe_ind].bottom)))
 
             # Kijkt of de output van het neural net groter is dan de thresholdvalue, zo ja, dan springt de vogel
             if output[0] > 0.5:
                 bird.jump()
+            if recorder is not None:
+                recorder.record(x, output[0] > 0.5)
+        t = profiler.add("network", t)
 
         # Beweegt de vloer
         base.move()
  
-        rem = []
+        rem = 0
         add_pipe = False
         # Voor elke pijp  in de array pipes
         for pipe in pipes:
             # Beweegt de pijp
             pipe.move()
+            t = profiler.add("pipes", t)
 
             # Deze for loop kijkt voor elke vogel of hij een pijp aanraakt, zo ja, dan gaat hij dood
-            for bird in birds:
-                if pipe.collide(bird, win):
-                    ge[birds.index(bird)].fitness -= 1
-                    nets.pop(birds.index(bird))
-                    ge.pop(birds.index(bird))
-                    birds.pop(birds.index(bird))
-
-            # Als de pijp links buiten het scherm is wordt hij aan de verwijder (rem) array toegevoegd
+            for x in flock.living():
+                if collide(pipe, birds[x], win):
+                    ge[x].fitness -= 1
+                    flock.kill(x)
+            t = profiler.add("collision", t)
+
+            # Als de pijp links buiten het scherm is wordt hij meegeteld in de verwijder (rem) teller
             if pipe.x + pipe.PIPE_TOP.get_width() < 0:
-                rem.append(pipe)
+                rem += 1
 
             # Als de vogels de pijp voorbij zijn, dan wordt de variabele om een nieuw toe te voegen (add_pipe) op true gezet
-            if not pipe.passed and pipe.x < bird.x:
+            if not pipe.passed and pipe.x < birds[0].x:
                 pipe.passed = True
                 add_pipe = True
 
@@ -406,35 +953,43 @@ def eval_genomes(genomes, config):
             # Score gaat omhoog met 1
             score += 1
 
-            # De fitness van de genome gaat omhoog
-            for genome in ge:
-                genome.fitness += 5
+            # De fitness van de genomes van de levende vogels gaat omhoog
+            for x in flock.living():
+                ge[x].fitness += 5
 
             # Een nieuwe pijp wordt aan de array toegevoegd
-            pipes.append(Pipe(WIN_WIDTH))
+            pipes.append(WIN_WIDTH, course[score])
 
 
-        # Elke pijp in de verwijder (rem) array wordt verwijderd
-        for r in rem:
-            pipes.remove(r)
+        # De pijpen die links uit het scherm zijn worden verwijderd, dat zijn altijd de eerste
+        pipes.drop(rem)
+        t = profiler.add("pipes", t)
 
-        # Als een vogel de grond raakt gaat hij dood
-        for bird in birds:
-            if bird.y + bird.img.get_height() - 10 >= FLOOR or bird.y < -50:
-                nets.pop(birds.index(bird))
-                ge.pop(birds.index(bird))
-                birds.pop(birds.index(bird))
+        for x in flock.living():
+            # Als een vogel de grond raakt gaat hij dood
+            if birds[x].y + birds[x].img.get_height() - 10 >= FLOOR or birds[x].y < -50:
+                flock.kill(x)
 
             # code zodat de vogels stoppen op een score en direct de evaluate functie sluit, los van de generatie
             # eval functie loop sluit als alle vogels dood zijn en de fitness hoger is dan de threshold in de config-feedforward.txt
-            if score > 150:
-                ge[birds.index(bird)].fitness = 1000
-                nets.pop(birds.index(bird))
-                ge.pop(birds.index(bird))
-                birds.pop(birds.index(bird))
+            elif score > MAX_SCORE:
+                ge[x].fitness = 1000
+                flock.kill(x)
+        t = profiler.add("collision", t)
 
-        # De functie om het beeld te tekenen wordt aangeroepen
-        draw_window(WIN, birds, pipes, base, score, gen, pipe_ind)
+        # Met --live gaat de stand naar de viewers, alleen als de vorige stand lang genoeg geleden is
+        if live_publisher is not None and live_publisher.due():
+            live_publisher.publish(gen, score, frame, [bird.y for bird in birds], [bird.tilt for bird in birds],
+                                   flock.alive, pipes)
+            t = profiler.add("draw", t)
+
+        # De functie om het beeld te tekenen wordt aangeroepen, behalve als deze frame niet getekend hoeft te worden
+        if draw:
+            draw_window(win, [birds[x] for x in flock.living()], pipes, base, score, gen, pipe_ind)
+            profiler.add("draw", t)
+
+    if recorder is not None:
+        recorder.save(replay.generation_file(RECORD, gen))
 
 # Deze functie zorgt ervoor dat de best bird game afgebeeld wordt
 def bestGameDraw(win, bird, pipes, base, score):
@@ -442,27 +997,27 @@ def bestGameDraw(win, bird, pipes, base, score):
     draws the windows for the main game loop
     :param win: pygame window surface
     :param bird: a Bird object
-    :param pipes: List of pipes
+    :param pipes: Pipes with the pipes on the screen
     :param score: score of the game (int)
     :return: None
     """
-    # Dit tekent de achtergrond
-    win.blit(bg_img, (0,0))
+    # Dit tekent de achtergrond over de plekken waar in de vorige frame iets getekend is
+    dirty_rects.begin(win, assets.image("bg"))
 
     # Dit tekent alle pijpen in de pipes array
     for pipe in pipes:
-        pipe.draw(win)
+        dirty_rects.add(pipe.draw(win))
 
     # Deze functies worden aangeroepen om de grond (base) en de vogel (bird) te tekenen
-    base.draw(win)
-    bird.draw(win)
+    dirty_rects.add(base.draw(win))
+    dirty_rects.add(bird.draw(win))
 
-    # Hiermee wordt de score afgebeeld
-    score_label = STAT_FONT.render("Score: " + str(score),1,(255,255,255))
-    win.blit(score_label, (WIN_WIDTH - score_label.get_width() - 15, 10))
+    # Hiermee wordt de score afgebeeld, de tekst wordt alleen opnieuw gerenderd als de score verandert
+    score_label = assets.label("score", "Score: " + str(score))
+    dirty_rects.add(win.blit(score_label, (WIN_WIDTH - score_label.get_width() - 15, 10)))
 
-    # Deze functie update het hele scherm met de wijziginen die met de code hierboven worden afgebeeld
-    pygame.display.update()
+    # Deze functie update alleen de plekken op het scherm die veranderd zijn, behalve bij een export zonder scherm
+    dirty_rects.end(win)
 
 # Hier wordt het game over scherm getekend
 def end_screen(win):
@@ -474,7 +1029,7 @@ def end_screen(win):
     # Run op true zetten zorgt ervoor dat er weer een 'game loop' plaats kan vinden
     run = True
     # Dit vult een variabele met een uitleg tekst
-    text_label = END_FONT.render("Space to Quit", 1, (255,255,255))
+    text_label = assets.font("end").render("Space to Quit", 1, (255,255,255))
     # Deze while loop is de nieuwe 'game loop'
     while run:
         # Als er een knop op het toetsenbord wordt ingedrukt sluit de while loop
@@ -491,26 +1046,57 @@ def end_screen(win):
     pygame.quit()
     quit()
 
+# Deze functie geeft het bestand met de beste vogel, ChickenDinner.json als die er is en anders de oude ChickenDinner.txt
+def best_bird_file():
+    """
+    the file with the best bird, or None if there is no (non-empty) file
+    :return: str
+    """
+    for filename in ("ChickenDinner.json", "ChickenDinner.txt"):
+        if os.path.isfile(filename) and os.path.getsize(filename) > 0:
+            return filename
+    return None
+
+# Deze functie laadt het neurale net van de beste vogel
+def load_best_bird(config, filename=None):
+    """
+    loads the network of the best bird, a champion file doesn't need pickle or a genome
+    :param config: neat config, only used for the old pickled genome
+    :param filename: file with the bird, None uses best_bird_file() (str)
+    :return: network with an activate method
+    """
+    if filename is None:
+        filename = best_bird_file()
+    if filename.endswith(".json"):
+        return champion.load(filename)
+
+    # Het vogeltje opgeslagen in ChickenDinner.txt wordt hier opgehaald en in een variabele gezet
+    with open(filename, "rb") as save:
+       bestBird = pickle.load(save)
+    return neat.nn.FeedForwardNetwork.create(bestBird, config)
+
 # Deze code speelt het beste vogeltje af
-def bestGame(config):
+def bestGame(config, seed=None):
     # win is vereist voor pygame
-    global WIN
-    win = WIN
+    win = assets.win
 
     # De score en en vogel worden aangemaakt en in een variabele gezet
     score = 0
     bird = Bird(230,350)
 
-    # Het vogeltje opgeslagen in ChickenDinner.txt wordt hier opgehaald en in een variabele gezet
-    with open("ChickenDinner.txt", "rb") as save:
-       bestBird = pickle.load(save)
-
-    # Het neurale net van het beste vogeltje wordt aangemaakt
-    net = neat.nn.FeedForwardNetwork.create(bestBird, config)
+    # Het neurale net van het beste vogeltje wordt opgehaald uit ChickenDinner.json of ChickenDinner.txt
+    net = load_best_bird(config)
 
-    # De vloer en pijpen worden aangemaakt
+    # De baan, vloer en pijpen worden aangemaakt
+    course = Course(seed)
     base = Base(FLOOR)
-    pipes = [Pipe(700)]
+    pipes = Pipes(700, course[0])
+
+    # Met --record wordt het spel opgenomen
+    recorder = None
+    if RECORD:
+        import replay
+        recorder = replay.Recorder(course.seed)
 
     # Dit is een object dat de verlopen tijd per frame bijhoudt
     clock = pygame.time.Clock()
@@ -529,6 +1115,10 @@ def bestGame(config):
                 quit()
                 break
 
+            # Als het scherm weer zichtbaar wordt moet alles opnieuw getekend worden
+            if event.type == pygame.VIDEOEXPOSE:
+                dirty_rects.reset()
+
         pipe_ind = 0
         # Als er een pijp in de pipes array zit en het vogeltje voorbij de pijp is, dan wordt vanaf hier naar de volgende pijp in de array gekeken door middel van pipe_ind
         if len(pipes) > 1 and bird.x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
@@ -543,20 +1133,22 @@ def bestGame(config):
         # Kijkt of de output van het neural net groter is dan de thresholdvalue, zo ja, dan springt de vogel
         if output[0] > 0.5:
             bird.jump()
+        if recorder is not None:
+            recorder.record(0, output[0] > 0.5)
 
         # Beweegt de vloer
         base.move()
 
-        rem = []
+        rem = 0
         add_pipe = False
         # Voor elke pijp  in de array pipes
         for pipe in pipes:
             # Beweegt de pijp
             pipe.move()
 
-            # Als de pijp links buiten het scherm is wordt hij aan de verwijder (rem) array toegevoegd
+            # Als de pijp links buiten het scherm is wordt hij meegeteld in de verwijder (rem) teller
             if pipe.x + pipe.PIPE_TOP.get_width() < 0:
-                rem.append(pipe)
+                rem += 1
 
              # Als de vogel de pijp voorbij is, dan wordt de variabele om een nieuw toe te voegen (add_pipe) op true gezet
             if not pipe.passed and pipe.x < bird.x:
@@ -569,45 +1161,167 @@ def bestGame(config):
             score += 1
             
             # Een nieuwe pijp wordt aan de array toegevoegd
-            pipes.append(Pipe(WIN_WIDTH))
+            pipes.append(WIN_WIDTH, course[score])
 
-        # Elke pijp in de verwijder (rem) array wordt verwijderd
-        for r in rem:
-            pipes.remove(r)
+        # De pijpen die links uit het scherm zijn worden verwijderd, dat zijn altijd de eerste
+        pipes.drop(rem)
 
         # Als de vogel een pijp raakt, dan stopt de game loop
         if pipe.collide(bird, win):
             break
 
         # Als de vogel de vloer raaktstopt de gameloop
-        if bird.y + bird_images[0].get_height() - 10 >= FLOOR:
+        if bird.y + bird.IMGS[0].get_height() - 10 >= FLOOR:
             break
 
         # De functie om het beeld te tekenen wordt aangeroepen
-        bestGameDraw(WIN, bird, pipes, base, score)
+        bestGameDraw(win, bird, pipes, base, score)
+
+    if recorder is not None:
+        filename = os.path.join(RECORD, "best-{}.flr".format(course.seed))
+        recorder.save(filename)
+        print("Spel opgenomen in " + filename)
     # De functie om het game over scherm te tekenen wordt aangeroepen
     end_screen(win)
 
-def run(config_file):
+def load_config(config_file, overrides=None):
     """
-    runs the NEAT algorithm to train a neural network to play flappy bird.
+    loads the neat config and changes the settings in overrides
     :param config_file: location of config file
-    :return: None
+    :param overrides: dict with setting names (for example pop_size or conn_add_prob) and values
+    :return: neat config
     """
-
     config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
                          neat.DefaultSpeciesSet, neat.DefaultStagnation,
                          config_file)
 
+    # Elke instelling staat in een van de secties van de config, de eerste sectie met die naam wordt aangepast
+    for name, value in (overrides or {}).items():
+        for section in (config, config.genome_config, config.species_set_config,
+                        config.stagnation_config, config.reproduction_config):
+            if hasattr(section, name):
+                setattr(section, name, value)
+                break
+        else:
+            raise ValueError("unknown config setting {!r}".format(name))
+    return config
+
+
+def train(config, generations=None, checkpoints=True, save=True, verbose=True):
+    """
+    runs the NEAT algorithm to train a neural network to play flappy bird.
+    :param config: neat config
+    :param generations: maximum number of generations, None uses GENERATIONS (int)
+    :param checkpoints: save checkpoints in CHECKPOINT_DIR (bool)
+    :param save: save the best bird in ChickenDinner.txt and ChickenDinner.json (bool)
+    :param verbose: print the progress in the terminal (bool)
+    :return: (best genome, StatisticsReporter), the best genome is None if a resumed run had no generations left
+    """
+    if generations is None:
+        generations = GENERATIONS
+
+    # Met een seed worden NEAT en de banen van elke generatie elke keer hetzelfde
+    if SEED is not None:
+        random.seed(SEED)
+
     # Create the population, which is the top-level object for a NEAT run.
-    p = neat.Population(config)
+    # Met --resume gaat de training verder vanaf de laatste checkpoint, inclusief de statistieken
+    import checkpoint
+    latest = checkpoint.latest_checkpoint(CHECKPOINT_DIR) if RESUME and checkpoints else None
+    stats = None
+    if latest is not None:
+        print("Verder trainen vanaf " + latest)
+        p, stats = checkpoint.restore_checkpoint(latest)
+        # Een checkpoint van de laatste generatie heeft niets meer te trainen, dan blijft de opgeslagen beste vogel staan
+        if p.generation >= generations:
+            print("De checkpoint is al bij generatie {}, er zijn geen generaties meer te trainen (--generations {})"
+                  .format(p.generation, generations))
+            return None, stats
+    else:
+        p = neat.Population(config)
 
     # Add a stdout reporter to show progress in the terminal.
-    p.add_reporter(neat.StdOutReporter(True))
-    stats = neat.StatisticsReporter()
+    if verbose:
+        p.add_reporter(neat.StdOutReporter(True))
+    if stats is None:
+        stats = neat.StatisticsReporter()
     p.add_reporter(stats)
-    #p.add_reporter(neat.Checkpointer(5))
+    if checkpoints:
+        p.add_reporter(checkpoint.AtomicCheckpointer(CHECKPOINT_DIR, stats, CHECKPOINT_EVERY))
+
+    # Schrijft per generatie de tijd per fase, frames per seconde en levende vogels per frame weg
+    telemetry = None
+    if TELEMETRY:
+        telemetry = TelemetryReporter(TELEMETRY, profiler)
+        p.add_reporter(telemetry)
+
+    # Kiest de functie die de vogels evalueert
+    evaluator = None
+    if HALVING:
+        import halving
+        eval_function = halving.SuccessiveHalving(HALVING, HALVING_COURSES, HALVING_KEEP, HALVING_BUDGET).eval_genomes
+    elif CLUSTER:
+        import cluster
+        evaluator = cluster.Coordinator(cluster.parse_address(CLUSTER), timeout=CLUSTER_TIMEOUT)
+        eval_function = evaluator.eval_genomes
+    elif WORKERS:
+        import parallel
+        evaluator = parallel.ParallelEvaluator(WORKERS)
+        eval_function = evaluator.eval_genomes
+    elif VECTORIZED:
+        import population
+        eval_function = population.eval_genomes
+    else:
+        eval_function = eval_genomes
+
+    # Genomes die al eens dezelfde baan gespeeld hebben hoeven niet opnieuw te spelen
+    # Met --halving hangt de fitness ook af van de rest van de generatie, dan wordt er niets onthouden
+    if FITNESS_CACHE and not HALVING:
+        import fitness_cache
+        eval_function = fitness_cache.CachedEvaluator(eval_function, FITNESS_CACHE).eval_genomes
+
+    # Met --live kunnen andere processen de training bekijken
+    global live_publisher
+    if LIVE:
+        import live
+        # Door de verdeling over de species kan een generatie iets groter zijn dan pop_size
+        live_publisher = live.Publisher(LIVE, 2 * config.pop_size)
+
+    # De train functie wordt maximaal generations keer aangeroepen en de beste vogel wordt opgeslagen in winner, generaties van voor de checkpoint tellen mee
+    try:
+        winner = p.run(eval_function, generations - p.generation)
+    finally:
+        if evaluator is not None:
+            evaluator.close()
+        if live_publisher is not None:
+            live_publisher.close()
+            live_publisher = None
+        if telemetry is not None:
+            telemetry.close()
+
+    if verbose:
+        # De statistieken van de beste vogel worden geprint in de console
+        print('\nBest genome:\n{!s}'.format(winner))
+
+    if save and winner is not None:
+        # Slaat de beste vogel op in ChickenDinner.txt
+        with open("ChickenDinner.txt", "wb") as save_file:
+            pickle.dump(winner, save_file)
+
+        # En ook als los netwerk in ChickenDinner.json, dat kan zonder neat en pickle geladen worden
+        champion.export_genome(winner, config, "ChickenDinner.json")
+
+    return winner, stats
+
+
+def run(config_file):
+    """
+    asks the user to train birds or to let the best bird play
+    :param config_file: location of config file
+    :return: None
+    """
 
+    config = load_config(config_file)
 
     # De gebruiker wordt gevraagd of die een vogel wilt trainen of afspelen
     keuzeVraag = input("Typ 0 om te trainen, typ 1 om de beste vogel te laten spelen")
@@ -618,37 +1332,267 @@ def run(config_file):
 
     # Als de gebruiker wilt trainen
     if (keuzeVraag == "0"):
-        # De train functie wordt maximaal 50 keer aangeroepen en de beste vogel wordt opgeslagen in winner
-        winner = p.run(eval_genomes, 50)
+        train(config)
 
-        # De statistieken van de beste vogel worden geprint in de console
-        print('\nBest genome:\n{!s}'.format(winner))
-
-        # Slaat de beste vogel op in ChickenDinner.txt
-        with open("ChickenDinner.txt", "wb") as save:
-            pickle.dump(winner, save)
-
-    # Als de gebruiker een vogel wilt afspelen, maar er geen vogel bestand bestaat, dan sluit het programma en wordt de gebruiker verteld om een vogel te trainen
-    elif (keuzeVraag == "1" and os.path.isfile("ChickenDinner.txt") == False):
-        print("Er bestaat geen beste vogel, probeer eerst te trainen")
-        quit()
-
-    # Als de gebruiker een vogel wilt afspelen, maar het vogel bestand leeg is, dan sluit het programma en wordt de gebruiker verteld om een vogel te trainen
-    elif (keuzeVraag == "1" and os.path.getsize("ChickenDinner.txt") == 0):
+    # Als de gebruiker een vogel wilt afspelen, maar er geen (gevuld) vogel bestand bestaat, dan sluit het programma en wordt de gebruiker verteld om een vogel te trainen
+    elif (keuzeVraag == "1" and best_bird_file() is None):
         print("Er bestaat geen beste vogel, probeer eerst te trainen")
         quit()
 
     # Als de gebruiker een vogel wilt afspelen, wordt de afspeel functie aangeroepen
     elif (keuzeVraag == "1"):
-        bestGame(config)
+        bestGame(config, SEED)
+
+
+def play_headless(net, course, max_score=None, recorder=None):
+    """
+    lets one network play a course without a screen
+    :param net: network with an activate method
+    :param course: Course
+    :param max_score: the game stops when the score gets higher than this, None uses MAX_SCORE (int)
+    :param recorder: replay.Recorder that records the jumps, None records nothing
+    :return: (score, frames)
+    """
+    if max_score is None:
+        max_score = MAX_SCORE
+    bird = Bird(230,350)
+    pipes = Pipes(700, course[0])
+    score = 0
+    frames = 0
+
+    while score <= max_score:
+        frames += 1
+        pipe_ind = 0
+        if len(pipes) > 1 and bird.x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
+            pipe_ind = 1
+
+        bird.move()
+        output = net.activate((bird.y, abs(bird.y - pipes[pipe_ind].height), abs(bird.y - pipes[pipe_ind].bottom)))
+        if output[0] > 0.5:
+            bird.jump()
+        if recorder is not None:
+            recorder.record(0, output[0] > 0.5)
+
+        rem = 0
+        add_pipe = False
+        for pipe in pipes:
+            pipe.move()
+            if pipe.collide(bird, None):
+                return score, frames
+            if pipe.x + pipe.PIPE_TOP.get_width() < 0:
+                rem += 1
+            if not pipe.passed and pipe.x < bird.x:
+                pipe.passed = True
+                add_pipe = True
+
+        if add_pipe:
+            score += 1
+            pipes.append(WIN_WIDTH, course[score])
+        pipes.drop(rem)
+
+        if bird.y + bird.img.get_height() - 10 >= FLOOR or bird.y < -50:
+            return score, frames
+
+    return score, frames
+
+
+def build_parser():
+    """
+    the command line options, see python flappy_bird_neat.py --help
+    :return: argparse.ArgumentParser
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Bird of Flappy: flappy bird that learns itself with NEAT. "
+                    "Without a command you are asked to train or play.")
+    parser.add_argument("command", nargs="?",
+                        choices=["train", "play", "bench", "eval", "sweep", "replay", "export", "watch", "worker"],
+                        help="train birds, let the best bird play, run the benchmarks, "
+                             "evaluate the best bird without a screen, run a hyperparameter sweep, watch a replay, "
+                             "export a game as video, watch a live training or evaluate genomes for a --cluster training")
+    parser.add_argument("file", nargs="?",
+                        help="replay: the replay file to watch, export: a replay or bird file (default: the best bird)")
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt"),
+                        help="the NEAT config file")
+    parser.add_argument("--generations", type=int, default=GENERATIONS, help="maximum number of generations")
+    parser.add_argument("--max-score", type=int, default=MAX_SCORE, help="score at which a bird has finished")
+    parser.add_argument("--seed", type=int, help="seed for NEAT and the courses, makes a run reproducible")
+    parser.add_argument("--course-seed", type=int, help="play this course in every generation")
+    parser.add_argument("--headless", action="store_true", help="train without a screen and without fps limit")
+    parser.add_argument("--vectorized", action="store_true", help="simulate whole generations with numpy")
+    parser.add_argument("--workers", type=int, default=0, help="evaluate every generation on this many processes")
+    parser.add_argument("--cluster", metavar="HOST:PORT",
+                        help="train: evaluate on workers that connect to this address, worker: the address of the training")
+    parser.add_argument("--cluster-timeout", type=float, default=CLUSTER_TIMEOUT, metavar="SECONDS",
+                        help="train: seconds a cluster worker gets for a batch before another worker gets it")
+    parser.add_argument("--render-every", type=int, default=1, help="only draw every Nth frame while training")
+    parser.add_argument("--telemetry", help="write timing per generation to this JSONL or CSV file")
+    parser.add_argument("--fitness-cache", type=int, default=0, help="remember the fitness of this many genomes")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR, help="folder for checkpoints")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY, help="generations between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continue training from the newest checkpoint")
+    parser.add_argument("--collision", choices=["mask", "gap"], default=COLLISION,
+                        help="collisions while training: pixel perfect masks or faster hit-boxes against the gap")
+    parser.add_argument("--record", metavar="DIR", help="record every generation or game of the best bird in this folder")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay: frames of the game per frame on the screen, export: 1 is real time")
+    parser.add_argument("--output",
+                        help="export: video file, or a folder for PNG frames (default export.mp4), bench: JSON file for the results")
+    parser.add_argument("--fps", type=int, default=30, help="export: frames per second of the video, watch: of the window")
+    parser.add_argument("--live", metavar="NAME",
+                        help="train: publish the game in shared memory with this name, watch: the training to watch")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=V1,V2",
+                        help="sweep: config setting and the values to try, can be given more than once")
+    parser.add_argument("--jobs", type=int, default=None, help="sweep: number of runs at the same time")
+    parser.add_argument("--summary", help="sweep or eval: file for the results, sweep.json for a sweep")
+    parser.add_argument("--courses", type=int, default=1,
+                        help="eval: number of seeded courses to play, train with --halving: courses in the first round")
+    parser.add_argument("--halving", type=int, default=0, metavar="ROUNDS",
+                        help="train: play every generation on more courses in this many rounds of successive halving")
+    parser.add_argument("--halving-keep", type=float, default=HALVING_KEEP,
+                        help="train: part of the genomes that goes to the next halving round")
+    parser.add_argument("--halving-budget", type=int, metavar="FRAMES",
+                        help="train: --halving starts no new round when it would go over this many bird frames "
+                             "per generation, the first round is always played completely")
+    parser.add_argument("--champion", action="append", default=[], metavar="FILE",
+                        help="eval: bird to evaluate, can be given more than once (default: the best bird)")
+    return parser
+
+
+def main(argv=None):
+    """
+    the command line interface
+    :param argv: list of arguments, None uses sys.argv
+    :return: None
+    """
+    global HEADLESS, VECTORIZED, WORKERS, CLUSTER, CLUSTER_TIMEOUT, RENDER_EVERY, TELEMETRY, SEED, COURSE_SEED, FITNESS_CACHE
+    global CHECKPOINT_DIR, CHECKPOINT_EVERY, RESUME, GENERATIONS, MAX_SCORE, RECORD, COLLISION, LIVE
+    global HALVING, HALVING_COURSES, HALVING_KEEP, HALVING_BUDGET
+
+    args, rest = build_parser().parse_known_args(argv)
+    # Alleen de benchmarks hebben hun eigen opties
+    if rest and args.command != "bench":
+        build_parser().error("unrecognized arguments: " + " ".join(rest))
+    # --halving speelt zelf alle banen in een numpy spel, deze opties zouden stil genegeerd worden
+    if args.halving:
+        ignored = [option for option, value in (("--workers", args.workers), ("--cluster", args.cluster),
+                                                ("--vectorized", args.vectorized), ("--record", args.record),
+                                                ("--live", args.live)) if value]
+        if ignored:
+            build_parser().error("--halving can not be combined with " + ", ".join(ignored))
+
+    HEADLESS = HEADLESS or args.headless or args.command in ("bench", "eval", "sweep", "export", "worker")
+    VECTORIZED = args.vectorized
+    WORKERS = args.workers
+    CLUSTER = args.cluster
+    CLUSTER_TIMEOUT = args.cluster_timeout
+    RENDER_EVERY = args.render_every
+    TELEMETRY = args.telemetry
+    SEED = args.seed
+    COURSE_SEED = args.course_seed
+    FITNESS_CACHE = args.fitness_cache
+    HALVING = args.halving
+    HALVING_COURSES = args.courses
+    HALVING_KEEP = args.halving_keep
+    HALVING_BUDGET = args.halving_budget
+    CHECKPOINT_DIR = args.checkpoint_dir
+    CHECKPOINT_EVERY = args.checkpoint_every
+    RESUME = args.resume
+    GENERATIONS = args.generations
+    MAX_SCORE = args.max_score
+    RECORD = args.record
+    COLLISION = args.collision
+    LIVE = args.live
+
+    # Zonder eigen sleutel zou iedereen op het netwerk de training of de workers berichten kunnen sturen
+    if CLUSTER and not os.environ.get("FLAPPY_CLUSTER_KEY"):
+        print("Zet FLAPPY_CLUSTER_KEY op elke machine op hetzelfde geheim om --cluster te gebruiken")
+        sys.exit(1)
+
+    if HEADLESS:
+        # De dummy video driver van SDL heeft geen echt scherm nodig, zo kan er ook op een server zonder display getraind worden
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    if args.command is None:
+        run(args.config)
+
+    elif args.command == "train":
+        train(load_config(args.config))
+
+    elif args.command == "eval" and (args.courses > 1 or args.champion):
+        import bulk_eval
+        # De banen krijgen de seeds seed, seed+1, ... zodat elke baan ook met play --seed N te bekijken is
+        first = SEED if SEED is not None else 0
+        seeds = list(range(first, first + args.courses))
+        files = args.champion or [best_bird_file()]
+        if None in files:
+            print("Er bestaat geen beste vogel, probeer eerst te trainen")
+            sys.exit(1)
+        report = bulk_eval.evaluate(files, load_config(args.config), seeds, WORKERS or None)
+        bulk_eval.print_report(report)
+        if args.summary:
+            with open(args.summary, "w") as f:
+                json.dump(report, f, indent=2)
+            print("Resultaten opgeslagen in " + args.summary)
+
+    elif args.command in ("play", "eval"):
+        if best_bird_file() is None:
+            print("Er bestaat geen beste vogel, probeer eerst te trainen")
+            sys.exit(1)
+        config = load_config(args.config)
+        if args.command == "play":
+            bestGame(config, SEED)
+        else:
+            course = Course(SEED)
+            score, frames = play_headless(load_best_bird(config), course)
+            print("seed {} score {} frames {}".format(course.seed, score, frames))
+
+    elif args.command == "bench":
+        import bench
+        # --output wordt door deze parser gelezen, maar is bij bench de optie van bench zelf
+        if args.output is not None:
+            rest = rest + ["--output", args.output]
+        bench.main(rest)
+
+    elif args.command == "sweep":
+        import sweep
+        sweep.main(args)
+
+    elif args.command == "replay":
+        if args.file is None:
+            build_parser().error("replay needs a replay file")
+        import replay
+        replay.play(args.file, args.speed)
+
+    elif args.command == "export":
+        import export
+        import replay
+        if args.file is not None and args.file.endswith(".flr"):
+            recording = replay.Replay.load(args.file)
+        elif args.file is None and best_bird_file() is None:
+            print("Er bestaat geen beste vogel, probeer eerst te trainen")
+            sys.exit(1)
+        else:
+            recording = export.record_game(load_best_bird(load_config(args.config), args.file), SEED)
+        output = args.output or "export.mp4"
+        count = export.export(recording, output, args.fps, args.speed)
+        print("{} frames opgeslagen in {}".format(count, output))
+
+    elif args.command == "watch":
+        import live
+        live.watch(args.live or "flappy-live", args.fps)
+
+    elif args.command == "worker":
+        if args.cluster is None:
+            build_parser().error("worker needs --cluster HOST:PORT")
+        import cluster
+        cluster.work(cluster.parse_address(args.cluster))
 
 
 if __name__ == '__main__':
-    # Determine path to configuration file. This path manipulation is
-    # here so that the script will run successfully regardless of the
-    # current working directory.
-    local_dir = os.path.dirname(__file__)
-    config_path = os.path.join(local_dir, 'config-feedforward.txt')
-    run(config_path)
+    # Zo gebruiken modules die flappy_bird_neat importeren dit script in plaats van een tweede kopie ervan
+    sys.modules.setdefault("flappy_bird_neat", sys.modules["__main__"])
+    main()
     pygame.quit()
-
@@ -0,0 +1,115 @@
+"""
+Fitness from several courses per generation with successive halving.
+One course per generation gives a noisy fitness: a bird that finishes one course can still crash
+on the next. Playing every genome on many courses costs too much, so the courses are played in
+rounds. In the first round every genome plays a few courses, after every round only the best part
+of the genomes is kept and they play twice as many new courses in the next round. The fitness of a
+genome is its mean fitness over all courses it played, so the genomes that matter most get the most
+reliable fitness.
+
+The budget is a soft limit: the first round is always played completely, because every genome
+needs a fitness. From the second round on a round only starts if its estimated cost, twice the
+frames its genomes played in the round before, fits in what is left of the budget.
+
+    python flappy_bird_neat.py train --halving 3 --courses 2 --halving-keep 0.5 --halving-budget 2000000
+
+Every round is one vectorized game (see population.simulate_courses) in which every genome plays
+all courses of that round at the same time.
+"""
+import math
+
+import numpy as np
+
+import flappy_bird_neat as game
+from batched_nets import BatchedNetworks
+from population import course_fitness, simulate_courses
+
+
+class SuccessiveHalving:
+    """
+    eval_genomes replacement that plays the genomes on more courses in rounds of successive halving
+    """
+
+    def __init__(self, rounds=3, courses=1, keep=0.5, budget=None):
+        """
+        Initialize the evaluator
+        :param rounds: maximum number of rounds per generation (int)
+        :param courses: courses per genome in the first round, every round this doubles (int)
+        :param keep: part of the genomes that goes to the next round (float)
+        :param budget: frames per generation added up over all birds after which no new round starts, the first
+            round is always played completely, None has no limit (int)
+        :return: None
+        """
+        if not 0 < keep < 1:
+            raise ValueError("keep must be between 0 and 1, not {!r}".format(keep))
+        self.rounds = rounds
+        self.courses = courses
+        self.keep = keep
+        self.budget = budget
+        # Per generatie: (gebruikte frames, aantal rondes, banen per genome van de beste genome)
+        self.history = []
+
+    def eval_genomes(self, genomes, config, course_seed=None):
+        """
+        sets the fitness of every genome, can be given to Population.run just like eval_genomes
+        :param genomes: list of (genome_id, genome) tuples
+        :param config: neat config
+        :param course_seed: seed of the first course, None uses game.new_course
+        :return: None
+        """
+        game.gen += 1
+        genomes = [genome for genome_id, genome in genomes]
+        nets = BatchedNetworks.create(genomes, config)
+        # De banen van een generatie zijn first, first + 1, ..., zo krijgen alle genomes dezelfde banen
+        first = game.new_course(course_seed).seed
+
+        total = np.zeros(len(genomes))
+        played = np.zeros(len(genomes), dtype=np.int64)
+        survivors = np.arange(len(genomes))
+        # Per ronde de genomes die na die ronde afvallen
+        dropped = []
+        used = 0
+        next_seed = first
+        courses = self.courses
+
+        for round_number in range(self.rounds):
+            seeds = list(range(next_seed, next_seed + courses))
+            next_seed += courses
+
+            # Elke overgebleven genome speelt alle banen van deze ronde, allemaal in een spel
+            genome_of = np.repeat(survivors, courses)
+            def activate(alive, inputs):
+                return nets.activate(inputs, genome_of[alive])[:, 0]
+
+            scores, frames, causes = simulate_courses(activate, seeds * len(survivors))
+            np.add.at(total, genome_of, course_fitness(scores, frames, causes))
+            played[survivors] += courses
+            used += int(frames.sum())
+
+            if len(survivors) <= 1 or round_number == self.rounds - 1:
+                break
+
+            mean = total[survivors] / played[survivors]
+            order = survivors[np.argsort(-mean, kind="stable")]
+            count = max(1, math.ceil(len(survivors) * self.keep))
+            # De volgende ronde kost ongeveer twee keer de frames die de beste genomes in deze ronde speelden
+            if self.budget is not None:
+                frames_per_genome = np.bincount(genome_of, weights=frames, minlength=len(genomes))
+                if used + 2 * frames_per_genome[order[:count]].sum() > self.budget:
+                    break
+
+            dropped.append(order[count:])
+            survivors = np.sort(order[:count])
+            courses *= 2
+
+        fitness = total / played
+        # Een genome die eerder afviel mag nooit hoger eindigen dan de genomes die in die ronde doorgingen
+        best_after = fitness[survivors].min()
+        for gone in reversed(dropped):
+            if len(gone):
+                fitness[gone] = np.minimum(fitness[gone], best_after)
+                best_after = min(best_after, fitness[gone].min())
+
+        for genome, value in zip(genomes, fitness.tolist()):
+            genome.fitness = value
+        self.history.append((used, len(dropped) + 1, int(played.max())))
@@ -0,0 +1,179 @@
+"""
+Collisions between birds and pipes with arithmetic instead of pixel masks.
+The pipes are rectangles and the bird image is the same in every frame (the masks are never rotated).
+So for every horizontal distance between a bird and a pipe, it is fixed which rows of the bird
+can touch the pipe. A HitBox stores the highest and lowest of those rows. A collision is then two
+comparisons with the edge of the gap, for one bird or with numpy arrays for a whole population.
+
+    python flappy_bird_neat.py train --collision gap     # training with hit-boxes, bestGame always uses masks
+    python hitbox.py replays/*.flr                        # how often hit-boxes and masks disagree
+
+This is exact as long as every row of the images has no transparent holes between its first and
+last pixel, which is true for the bird and pipe images. python hitbox.py checks that on recorded games.
+"""
+import sys
+
+import flappy_bird_neat as game
+
+
+class HitBox:
+    """
+    the rows of a bird image that overlap a pipe image, per horizontal distance between them.
+    The pipe is split in bands of rows that have the same width (the top of a pipe is wider than
+    the rest), every band is a rectangle.
+    """
+
+    def __init__(self, bird_img, pipe_img):
+        """
+        Initialize the hit-box from the masks of the images
+        :param bird_img: pygame surface of the bird
+        :param pipe_img: pygame surface of the pipe
+        :return: None
+        """
+        bird_spans = spans(bird_img)
+
+        # Opeenvolgende rijen van de pijp met dezelfde eerste en laatste kolom worden een band
+        bands = []
+        for row, left, right in spans(pipe_img):
+            if bands and bands[-1][1] == row - 1 and bands[-1][2:] == [left, right]:
+                bands[-1][1] = row
+            else:
+                bands.append([row, row, left, right])
+
+        # Per band: (eerste rij, laatste rij, kleinste dx, rijen van de vogel per dx)
+        # dx is de x van de pijp min de x van de vogel, buiten dx_min en dx_max raken ze elkaar nooit
+        self.bands = []
+        for top, bottom, left, right in bands:
+            dx_min = min(l for r, l, rr in bird_spans) - right
+            dx_max = max(rr for r, l, rr in bird_spans) - left
+            rows = []
+            for dx in range(dx_min, dx_max + 1):
+                touching = [r for r, l, rr in bird_spans if l <= dx + right and rr >= dx + left]
+                rows.append((touching[0], touching[-1]))
+            self.bands.append((top, bottom, dx_min, rows))
+
+    def hits(self, dx, bird_y, pipe_y):
+        """
+        checks if a bird touches a pipe, works for numbers and for numpy arrays
+        :param dx: x pos of the pipe minus x pos of the bird (int)
+        :param bird_y: rounded y pos of the bird, or an array with one per bird
+        :param pipe_y: y pos of the pipe image, or an array with one per bird
+        :return: bool, or a boolean array
+        """
+        # False, of een array met alleen False
+        hit = bird_y != bird_y
+        for top, bottom, dx_min, rows in self.bands:
+            if dx_min <= dx < dx_min + len(rows):
+                first, last = rows[dx - dx_min]
+                hit = hit | ((bird_y + last >= pipe_y + top) & (bird_y + first <= pipe_y + bottom))
+        return hit
+
+
+def spans(img):
+    """
+    the first and last column that is not transparent, for every row of an image with such a column
+    :param img: pygame surface
+    :return: list of (row, first column, last column)
+    """
+    mask = game.get_mask(img)
+    width, height = img.get_size()
+    result = []
+    for row in range(height):
+        columns = [column for column in range(width) if mask.get_at((column, row))]
+        if columns:
+            result.append((row, columns[0], columns[-1]))
+    return result
+
+
+# Per combinatie van een vogel en pijp plaatje wordt de hit-box maar een keer uitgerekend
+hitbox_cache = {}
+
+def get_hitbox(bird_img, pipe_img):
+    """
+    gets the (cached) hit-box of a bird image against a pipe image
+    :param bird_img: pygame surface
+    :param pipe_img: pygame surface
+    :return: HitBox
+    """
+    box = hitbox_cache.get((bird_img, pipe_img))
+    if box is None:
+        box = HitBox(bird_img, pipe_img)
+        hitbox_cache[(bird_img, pipe_img)] = box
+    return box
+
+
+def collide(pipe, bird, win=None):
+    """
+    checks if a bird touches a pipe, can be used instead of Pipe.collide
+    :param pipe: Pipe object
+    :param bird: Bird object
+    :param win: not used, for the same arguments as Pipe.collide
+    :return: Bool
+    """
+    dx = pipe.x - bird.x
+    y = round(bird.y)
+    # Hetzelfde als HitBox.hits, maar zonder de omweg voor numpy arrays
+    for box, pipe_y in ((get_hitbox(bird.img, pipe.PIPE_TOP), pipe.top),
+                        (get_hitbox(bird.img, pipe.PIPE_BOTTOM), pipe.bottom)):
+        for top, bottom, dx_min, rows in box.bands:
+            i = dx - dx_min
+            if 0 <= i < len(rows):
+                first, last = rows[i]
+                if y + last >= pipe_y + top and y + first <= pipe_y + bottom:
+                    return True
+    return False
+
+
+def validate(filenames):
+    """
+    replays recorded games and compares the hit-boxes with the masks for every living bird and
+    every pipe in every frame
+    :param filenames: replay files
+    :return: dict with the number of checks and disagreements
+    """
+    import replay
+
+    result = {"checks": 0, "near": 0, "only_hitbox": 0, "only_mask": 0, "birds": 0, "other_death_frame": 0}
+    for filename in filenames:
+        player = replay.Player(replay.Replay.load(filename))
+        jumps = player.replay.jumps
+        # De eerste frame waarin de hit-box een botsing geeft, per vogel
+        first_hit = [None] * len(jumps)
+        mask_hit = [None] * len(jumps)
+        while player.frame < len(player.replay):
+            player.step()
+            for i, bird in enumerate(player.birds):
+                if len(jumps[i]) < player.frame:
+                    continue
+                for pipe in player.pipes:
+                    mask = pipe.collide(bird, None)
+                    box = collide(pipe, bird)
+                    result["checks"] += 1
+                    if -pipe.PIPE_TOP.get_width() < pipe.x - bird.x < bird.img.get_width():
+                        result["near"] += 1
+                    if box and not mask:
+                        result["only_hitbox"] += 1
+                    elif mask and not box:
+                        result["only_mask"] += 1
+                    if box and first_hit[i] is None:
+                        first_hit[i] = player.frame
+                    if mask and mask_hit[i] is None:
+                        mask_hit[i] = player.frame
+
+        result["birds"] += len(jumps)
+        result["other_death_frame"] += sum(1 for a, b in zip(first_hit, mask_hit) if a != b)
+    return result
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("gebruik: python hitbox.py replays/gen-0001.flr [...]")
+        sys.exit(1)
+
+    result = validate(sys.argv[1:])
+    disagree = result["only_hitbox"] + result["only_mask"]
+    print("{} checks, {} with a bird next to a pipe".format(result["checks"], result["near"]))
+    print("hit-box and mask disagree {} times ({:.4%} of the checks next to a pipe): "
+          "{} only hit-box, {} only mask".format(disagree, disagree / max(result["near"], 1),
+                                                 result["only_hitbox"], result["only_mask"]))
+    print("{} of {} birds would die in another frame".format(result["other_death_frame"], result["birds"]))
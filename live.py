@@ -0,0 +1,256 @@
+"""
+Watching a training run from another process.
+The training publishes the state of the game (y, tilt and alive of every bird, the pipes, score,
+generation) in a ring buffer in shared memory and never waits for anyone. A viewer attaches to the
+shared memory, draws the newest state at its own frame rate and can be closed and opened again
+at any time, and several viewers can watch the same run.
+
+    python flappy_bird_neat.py train --headless --live flappy-live
+    python flappy_bird_neat.py watch --live flappy-live
+
+Layout: a header (MAGIC, version, capacity, pipe slots, ring slots, closed flag, sequence number of
+the newest state) followed by SLOTS states. Every state starts with its own sequence number that is
+odd while it is being written (a seqlock), so a viewer can detect a state that changed while it was
+copying it.
+"""
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import flappy_bird_neat as game
+
+MAGIC = b"FLLV"
+VERSION = 1
+SLOTS = 16
+MAX_PIPES = 4
+# Vaker publiceren heeft geen zin, de viewers tekenen toch niet sneller
+PUBLISH_FPS = 120
+
+HEADER = np.dtype([("magic", "S4"), ("version", "<u4"), ("capacity", "<u4"), ("max_pipes", "<u4"),
+                   ("slots", "<u4"), ("closed", "<u4"), ("seq", "<u8")])
+
+
+def state_dtype(capacity, max_pipes=MAX_PIPES):
+    """
+    the layout of one state in the ring buffer
+    :param capacity: maximum number of birds (int)
+    :param max_pipes: maximum number of pipes (int)
+    :return: numpy dtype
+    """
+    return np.dtype([("seq", "<u8"), ("gen", "<u4"), ("score", "<u4"), ("frame", "<u4"),
+                     ("count", "<u4"), ("pipes", "<u4"),
+                     ("pipe_x", "<f4", (max_pipes,)), ("pipe_height", "<f4", (max_pipes,)),
+                     ("y", "<f4", (capacity,)), ("tilt", "<f4", (capacity,)), ("alive", "u1", (capacity,))])
+
+
+class Publisher:
+    """
+    writes the state of the game into shared memory, used by the training
+    """
+
+    def __init__(self, name, capacity):
+        """
+        Initialize the publisher and create the shared memory, an existing one is never replaced
+        :param name: name of the shared memory (str)
+        :param capacity: maximum number of birds (int)
+        :return: None
+        """
+        self.dtype = state_dtype(capacity)
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=HEADER.itemsize + SLOTS * self.dtype.itemsize)
+        except FileExistsError:
+            # Kan van een training zijn die nog loopt, dus de shared memory wordt niet weggehaald
+            raise FileExistsError("shared memory {!r} already exists: another training uses this --live name, "
+                                  "or a training did not stop cleanly and /dev/shm/{} can be removed"
+                                  .format(name, name.lstrip("/"))) from None
+
+        self.header = np.ndarray((), HEADER, self.shm.buf, 0)
+        self.states = np.ndarray((SLOTS,), self.dtype, self.shm.buf, HEADER.itemsize)
+        self.states["seq"] = 0
+        self.header["version"] = VERSION
+        self.header["capacity"] = capacity
+        self.header["max_pipes"] = MAX_PIPES
+        self.header["slots"] = SLOTS
+        self.header["closed"] = 0
+        self.header["seq"] = 0
+        self.header["magic"] = MAGIC
+        self.capacity = capacity
+        self.seq = 0
+        self.last = 0.0
+
+    def due(self):
+        """
+        checks if it is time for a new state, so the game doesn't collect a state for nothing
+        :return: bool
+        """
+        return time.perf_counter() - self.last >= 1 / PUBLISH_FPS
+
+    def publish(self, gen, score, frame, y, tilt, alive, pipes):
+        """
+        writes a state to the next slot of the ring buffer, never waits for a viewer
+        :param gen: generation (int)
+        :param score: int
+        :param frame: frame of the generation (int)
+        :param y: y pos of every bird (list or array)
+        :param tilt: tilt of every bird (list or array)
+        :param alive: alive of every bird (list or array)
+        :param pipes: Pipes or a list of Pipe objects
+        :return: None
+        """
+        self.last = time.perf_counter()
+        count = min(len(y), self.capacity)
+        state = self.states[self.seq % SLOTS]
+
+        # Oneven: de state wordt geschreven, even: klaar
+        state["seq"] = 2 * self.seq + 1
+        state["gen"] = gen
+        state["score"] = score
+        state["frame"] = frame
+        state["count"] = count
+        state["pipes"] = min(len(pipes), MAX_PIPES)
+        for i, pipe in zip(range(MAX_PIPES), pipes):
+            state["pipe_x"][i] = pipe.x
+            state["pipe_height"][i] = pipe.height
+        state["y"][:count] = y[:count]
+        state["tilt"][:count] = tilt[:count]
+        state["alive"][:count] = alive[:count]
+        state["seq"] = 2 * self.seq + 2
+
+        self.seq += 1
+        self.header["seq"] = self.seq
+
+    def close(self):
+        """
+        tells the viewers that the training stopped and removes the shared memory
+        :return: None
+        """
+        self.header["closed"] = 1
+        del self.header, self.states
+        self.shm.close()
+        self.shm.unlink()
+
+
+class Viewer:
+    """
+    reads the newest state from the shared memory of a Publisher
+    """
+
+    def __init__(self, name):
+        """
+        Initialize the viewer and attach to the shared memory
+        :param name: name of the shared memory (str)
+        :return: None
+        """
+        self.shm = attach(name)
+        self.header = np.ndarray((), HEADER, self.shm.buf, 0)
+        if bytes(self.header["magic"]) != MAGIC or self.header["version"] != VERSION:
+            self.shm.close()
+            raise ValueError("{!r} is not a live training".format(name))
+        self.dtype = state_dtype(int(self.header["capacity"]), int(self.header["max_pipes"]))
+        self.states = np.ndarray((int(self.header["slots"]),), self.dtype, self.shm.buf, HEADER.itemsize)
+
+    @property
+    def closed(self):
+        """
+        the training has stopped
+        :return: bool
+        """
+        return bool(self.header["closed"])
+
+    def latest(self):
+        """
+        a copy of the newest complete state
+        :return: numpy record, or None if nothing is published yet
+        """
+        for attempt in range(3):
+            seq = int(self.header["seq"])
+            if seq == 0:
+                return None
+            slot = self.states[(seq - 1) % len(self.states)]
+            before = int(slot["seq"])
+            state = slot.copy()
+            # Als de publisher tijdens het kopieren in deze slot schreef wordt het opnieuw geprobeerd
+            if before == 2 * (seq - 1) + 2 and int(slot["seq"]) == before:
+                return state
+        return None
+
+    def close(self):
+        """
+        detaches from the shared memory, the training keeps running
+        :return: None
+        """
+        del self.header, self.states
+        self.shm.close()
+
+
+def attach(name):
+    """
+    opens existing shared memory without taking ownership of it
+    :param name: str
+    :return: SharedMemory
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Voor Python 3.13 zou de resource tracker de shared memory verwijderen als de viewer stopt
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def watch(name, fps=60):
+    """
+    shows a live training in a window until the window is closed or the training stops
+    :param name: name of the shared memory (str)
+    :param fps: frames per second of the viewer (int)
+    :return: None
+    """
+    import pygame
+
+    viewer = None
+    while viewer is None:
+        try:
+            viewer = Viewer(name)
+        # ValueError: de shared memory bestaat al maar de publisher heeft de header nog niet geschreven
+        except (FileNotFoundError, ValueError):
+            print("Wachten op training {!r}...".format(name))
+            time.sleep(1)
+
+    win = game.assets.win
+    clock = pygame.time.Clock()
+    birds = [game.Bird(230, 350) for _ in range(int(viewer.header["capacity"]))]
+    pipes = game.Pipes(size=MAX_PIPES)
+    base = game.Base(game.FLOOR)
+
+    run = True
+    while run and not viewer.closed:
+        clock.tick(fps)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                run = False
+            elif event.type == pygame.VIDEOEXPOSE:
+                game.dirty_rects.reset()
+
+        state = viewer.latest()
+        if state is None:
+            continue
+
+        living = []
+        for i in np.flatnonzero(state["alive"][:state["count"]]).tolist():
+            birds[i].y = float(state["y"][i])
+            birds[i].tilt = float(state["tilt"][i])
+            living.append(birds[i])
+        pipes.clear()
+        for i in range(state["pipes"]):
+            pipes.append(int(state["pipe_x"][i]), int(state["pipe_height"][i]))
+        # De vloer schuift elke frame Base.VEL op
+        base.x1 = -(int(state["frame"]) * base.VEL % base.WIDTH)
+        base.x2 = base.x1 + base.WIDTH
+
+        game.draw_window(win, living, pipes, base, int(state["score"]), int(state["gen"]), 0)
+
+    if viewer.closed:
+        print("De training is gestopt")
+    viewer.close()
@@ -0,0 +1,125 @@
+"""
+Evaluates a generation on several processes at once.
+The genomes are split into chunks and every chunk is played by a worker process on the same
+seeded Course, so the fitness of a genome does not depend on the chunk it ends up in or
+on the number of workers.
+"""
+import multiprocessing
+
+import flappy_bird_neat as game
+import population
+
+
+# De instellingen die bepalen hoe een vogel speelt, die moeten in elk worker proces hetzelfde zijn
+PLAY_SETTINGS = ("MAX_SCORE", "COLLISION")
+# Alle instellingen die main() van de command line overneemt, een nieuwe instelling hoort ook hier
+TRAIN_SETTINGS = ("HEADLESS", "VECTORIZED", "WORKERS", "CLUSTER", "CLUSTER_TIMEOUT", "RENDER_EVERY", "TELEMETRY",
+                  "SEED", "COURSE_SEED", "FITNESS_CACHE", "HALVING", "HALVING_COURSES", "HALVING_KEEP",
+                  "HALVING_BUDGET", "CHECKPOINT_DIR", "CHECKPOINT_EVERY", "RESUME", "GENERATIONS", "MAX_SCORE",
+                  "RECORD", "COLLISION", "LIVE")
+
+
+def settings(names=PLAY_SETTINGS):
+    """
+    the settings of the game in this process, for apply_settings in another process
+    :param names: names of the settings, by default the ones that change how a chunk is played
+    :return: dict with the names and values of the settings
+    """
+    return dict((name, getattr(game, name)) for name in names)
+
+
+def apply_settings(settings):
+    """
+    sets the settings of the training in this process. With the spawn start method (Windows and
+    macOS) a worker imports the game again and would otherwise play with the default settings
+    :param settings: dict from settings(), None changes nothing
+    :return: None
+    """
+    for name, value in (settings or {}).items():
+        setattr(game, name, value)
+
+
+def eval_chunk(chunk, config, course_seed, record=False, settings=None):
+    """
+    plays one chunk of genomes on the course of course_seed, runs in a worker process
+    :param chunk: list of genomes
+    :param config: neat config
+    :param course_seed: seed of the pipe course (int)
+    :param record: also return the recorded jumps of every genome (bool)
+    :param settings: dict from settings() of the training process, None uses the settings of this process
+    :return: list with the fitness of every genome, with record (fitness list, jumps list)
+    """
+    apply_settings(settings)
+    if not record:
+        return population.play(chunk, config, game.Course(course_seed))
+
+    import replay
+    recorder = replay.Recorder(course_seed)
+    return population.play(chunk, config, game.Course(course_seed), recorder), recorder.jumps
+
+
+class ParallelEvaluator:
+    """
+    eval_genomes replacement that spreads the genomes over a pool of worker processes
+    """
+
+    def __init__(self, num_workers=None, chunk_size=None):
+        """
+        Initialize the evaluator, the pool is started at the first generation
+        :param num_workers: number of worker processes, None uses all cores (int)
+        :param chunk_size: genomes per chunk, None divides the genomes evenly over the workers (int)
+        :return: None
+        """
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        stops the worker processes
+        :return: None
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def eval_genomes(self, genomes, config, course_seed=None):
+        """
+        sets the fitness of every genome, can be given to Population.run just like eval_genomes
+        :param genomes: list of (genome_id, genome) tuples
+        :param config: neat config
+        :param course_seed: seed of the course to play, None uses game.new_course
+        :return: None
+        """
+        game.gen += 1
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.num_workers)
+
+        genomes = [genome for genome_id, genome in genomes]
+        # Elke generatie krijgt een nieuwe baan, maar alle workers spelen dezelfde
+        course_seed = game.new_course(course_seed).seed
+
+        chunk_size = self.chunk_size or -(-len(genomes) // self.num_workers)
+        chunks = [genomes[i:i + chunk_size] for i in range(0, len(genomes), chunk_size)]
+        record = bool(game.RECORD)
+        results = self.pool.starmap(eval_chunk, [(chunk, config, course_seed, record, settings()) for chunk in chunks])
+
+        if record:
+            # De opnames van de chunks worden weer een opname van de hele generatie
+            import replay
+            recorder = replay.Recorder(course_seed, game.gen)
+            for fitnesses, jumps in results:
+                recorder.jumps.extend(jumps)
+            recorder.save(replay.generation_file(game.RECORD, game.gen))
+            results = [fitnesses for fitnesses, jumps in results]
+
+        for chunk, fitnesses in zip(chunks, results):
+            for genome, fitness in zip(chunk, fitnesses):
+                genome.fitness = fitness
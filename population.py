@@ -0,0 +1,367 @@
+"""
+NumPy version of the bird population, used to evaluate large generations headless.
+Instead of a list of Bird objects every property of the birds is stored in its own array,
+so one frame of physics is a couple of array operations for the whole population.
+
+The physics are an exact copy of Bird.move. Collisions with the pipes are first checked for all
+birds at once with the rectangle of the bird against the gap between the pipes, only the few birds
+that touch a pipe rectangle get the pixel perfect mask check of Pipe.collide. With --collision gap
+the hit-boxes of hitbox.py are used instead, without any masks.
+"""
+import numpy as np
+
+import flappy_bird_neat as game
+from batched_nets import BatchedNetworks
+
+
+class BirdPopulation:
+    """
+    struct-of-arrays representation of all the birds of one generation
+    """
+    MAX_ROTATION = game.Bird.MAX_ROTATION
+    ROT_VEL = game.Bird.ROT_VEL
+    JUMP_VEL = -10.5
+
+    def __init__(self, size, x=230, y=350):
+        """
+        Initialize the population, every bird starts at the same position
+        :param size: number of birds (int)
+        :param x: starting x pos of all the birds (int)
+        :param y: starting y pos of all the birds (int)
+        :return: None
+        """
+        self.x = x
+        self.y = np.full(size, float(y))
+        self.vel = np.zeros(size)
+        self.tick_count = np.zeros(size, dtype=np.int64)
+        self.tilt = np.zeros(size, dtype=np.int64)
+        self.height = np.full(size, float(y))
+        self.alive = np.ones(size, dtype=bool)
+
+        # Zonder scherm wordt de vogel nooit getekend en blijft hij dus altijd het eerste plaatje gebruiken
+        self.img = game.Bird.IMGS[0]
+        self.img_width = self.img.get_width()
+        self.img_height = self.img.get_height()
+
+    def __len__(self):
+        return len(self.y)
+
+    def jump(self, which):
+        """
+        make the selected birds jump
+        :param which: boolean array or index array of the birds that jump
+        :return: None
+        """
+        self.vel[which] = self.JUMP_VEL
+        self.tick_count[which] = 0
+        self.height[which] = self.y[which]
+
+    def move(self):
+        """
+        move all living birds, this does exactly the same as Bird.move
+        :return: None
+        """
+        alive = self.alive
+        self.tick_count[alive] += 1
+        t = self.tick_count[alive]
+
+        # for downward acceleration
+        displacement = self.vel[alive]*t + 0.5*(3)*t**2
+
+        # terminal velocity
+        displacement = np.where(displacement >= 16, 16.0, displacement)
+        displacement = np.where(displacement < 0, displacement - 2, displacement)
+
+        y = self.y[alive] + displacement
+        self.y[alive] = y
+
+        tilt = self.tilt[alive]
+        tilt_up = (displacement < 0) | (y < self.height[alive] + 50)
+        tilt = np.where(tilt_up & (tilt < self.MAX_ROTATION), self.MAX_ROTATION, tilt)
+        tilt = np.where(~tilt_up & (tilt > -90), tilt - self.ROT_VEL, tilt)
+        self.tilt[alive] = tilt
+
+    def out_of_bounds(self, floor):
+        """
+        checks which living birds hit the floor or flew above the screen
+        :param floor: y pos of the floor (int)
+        :return: boolean array
+        """
+        return self.alive & ((self.y + self.img_height - 10 >= floor) | (self.y < -50))
+
+    def collide(self, pipe):
+        """
+        checks which living birds touch a pipe, gives the same result as Pipe.collide
+        :param pipe: Pipe object
+        :return: boolean array
+        """
+        hit_top, hit_bottom = self.collide_gap(pipe.x, pipe.top, pipe.bottom)
+        return hit_top | hit_bottom
+
+    def collide_gap(self, x, top, bottom):
+        """
+        checks which living birds touch the top or the bottom pipe at x
+        :param x: x pos of the pipe (int)
+        :param top: y pos of the top pipe image, a number or an array with a value per bird
+        :param bottom: y pos of the bottom pipe image, a number or an array with a value per bird
+        :return: (boolean array for the top pipe, boolean array for the bottom pipe)
+        """
+        hit_top = np.zeros(len(self), dtype=bool)
+        hit_bottom = np.zeros(len(self), dtype=bool)
+        top_img = game.assets.image("pipe_top")
+        if self.x + self.img_width <= x or self.x >= x + top_img.get_width():
+            return hit_top, hit_bottom
+
+        if game.COLLISION == "gap":
+            # Met hit-boxes is het voor alle vogels tegelijk een vergelijking met de randen van de opening
+            import hitbox
+            y = np.round(self.y)
+            hit_top = self.alive & hitbox.get_hitbox(self.img, top_img).hits(x - self.x, y, top)
+            hit_bottom = self.alive & hitbox.get_hitbox(self.img, game.assets.image("pipe")).hits(x - self.x, y, bottom)
+            return hit_top, hit_bottom
+
+        # Alleen vogels waarvan de rechthoek niet helemaal in de opening tussen de pijpen zit kunnen de pijp raken
+        top = np.broadcast_to(top, self.y.shape)
+        bottom = np.broadcast_to(bottom, self.y.shape)
+        y = np.round(self.y)
+        candidates = np.flatnonzero(self.alive & ((y < top + top_img.get_height()) | (y + self.img_height > bottom)))
+
+        bird_mask = game.get_mask(self.img)
+        top_mask = game.get_mask(top_img)
+        bottom_mask = game.get_mask(game.assets.image("pipe"))
+        for i, bird_y, t, b in zip(candidates.tolist(), y[candidates].astype(int).tolist(),
+                                   top[candidates].tolist(), bottom[candidates].tolist()):
+            hit_bottom[i] = bool(bird_mask.overlap(bottom_mask, (x - self.x, b - bird_y)))
+            hit_top[i] = bool(bird_mask.overlap(top_mask, (x - self.x, t - bird_y)))
+        return hit_top, hit_bottom
+
+
+def simulate(population, course, activate, max_score=None, recorder=None, publisher=None):
+    """
+    runs the game for the whole population at once, with the same rules and fitness as eval_genomes
+    :param population: BirdPopulation
+    :param course: Course with the heights of the pipes
+    :param activate: function that gets an array with the indices of the living birds and an (n, 3)
+                     array with their inputs and returns an array with n outputs
+    :param max_score: the game stops when the score gets higher than this, None uses game.MAX_SCORE (int)
+    :param recorder: replay.Recorder that records the jumps, None records nothing
+    :param publisher: live.Publisher for viewers of the training, None publishes nothing
+    :return: (fitness array, score, frames)
+    """
+    if max_score is None:
+        max_score = game.MAX_SCORE
+    fitness = np.zeros(len(population))
+    pipes = game.Pipes(700, course[0])
+    score = 0
+    frames = 0
+
+    profiler = game.profiler
+    while population.alive.any():
+        frames += 1
+        t = profiler.frame(int(population.alive.sum()))
+
+        pipe_ind = 0
+        if len(pipes) > 1 and population.x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
+            pipe_ind = 1
+
+        # Alle levende vogels krijgen fitness en bewegen tegelijk
+        alive = np.flatnonzero(population.alive)
+        fitness[alive] += 0.1
+        population.move()
+        t = profiler.add("physics", t)
+
+        y = population.y[alive]
+        inputs = np.column_stack((y, np.abs(y - pipes[pipe_ind].height), np.abs(y - pipes[pipe_ind].bottom)))
+        output = activate(alive, inputs)
+        population.jump(alive[output > 0.5])
+        if recorder is not None:
+            recorder.record_many(alive, output > 0.5)
+        t = profiler.add("network", t)
+
+        rem = 0
+        add_pipe = False
+        for pipe in pipes:
+            pipe.move()
+            t = profiler.add("pipes", t)
+
+            # Vogels die een pijp raken gaan dood en verliezen fitness
+            hit = population.collide(pipe)
+            fitness[hit] -= 1
+            population.alive[hit] = False
+            t = profiler.add("collision", t)
+
+            if pipe.x + pipe.PIPE_TOP.get_width() < 0:
+                rem += 1
+
+            if not pipe.passed and pipe.x < population.x:
+                pipe.passed = True
+                add_pipe = True
+
+        if add_pipe:
+            score += 1
+            fitness[population.alive] += 5
+            pipes.append(game.WIN_WIDTH, course[score])
+
+        pipes.drop(rem)
+        t = profiler.add("pipes", t)
+
+        # Vogels die de grond of de bovenkant raken gaan dood
+        population.alive[population.out_of_bounds(game.FLOOR)] = False
+
+        if score > max_score:
+            fitness[population.alive] = 1000
+            population.alive[:] = False
+        t = profiler.add("collision", t)
+
+        if publisher is not None and publisher.due():
+            publisher.publish(game.gen, score, frames, population.y, population.tilt, population.alive, pipes)
+            profiler.add("draw", t)
+
+    return fitness, score, frames
+
+
+def simulate_courses(activate, seeds, max_score=None):
+    """
+    plays a different course for every bird at the same time, with the same rules as play_headless.
+    The pipes of all courses move and spawn at the same time, only their heights differ per bird.
+    :param activate: function that gets an array with the indices of the living birds and an (n, 3)
+                     array with their inputs and returns an array with n outputs
+    :param seeds: list with the seed of the course of every bird, a seed can be in it more than once
+    :param max_score: a game stops when the score gets higher than this, None uses game.MAX_SCORE (int)
+    :return: (score array, frames array, list with the cause of death per bird)
+    """
+    if max_score is None:
+        max_score = game.MAX_SCORE
+
+    n = len(seeds)
+    birds = BirdPopulation(n)
+    courses = {}
+    for seed in seeds:
+        if seed not in courses:
+            course = game.Course(seed)
+            courses[seed] = [course[i] for i in range(max_score + 2)]
+    heights = np.array([courses[seed] for seed in seeds]).reshape(n, max_score + 2)
+    pipe_width = game.assets.image("pipe").get_width()
+    pipe_height = game.assets.image("pipe").get_height()
+    everyone = np.arange(n)
+
+    scores = np.zeros(n, dtype=np.int64)
+    frames = np.zeros(n, dtype=np.int64)
+    causes = ["finished"] * n
+
+    def die(which, cause):
+        for i in np.flatnonzero(which).tolist():
+            causes[i] = cause
+        scores[which] = score
+        frames[which] = frame
+        birds.alive[which] = False
+
+    profiler = game.profiler
+    # Een pijp is [x, nummer van de pijp in de baan, voorbij]
+    pipes = [[700, 0, False]]
+    score = 0
+    frame = 0
+    while birds.alive.any():
+        frame += 1
+        t = profiler.frame(int(birds.alive.sum()))
+        pipe_ind = 0
+        if len(pipes) > 1 and birds.x > pipes[0][0] + pipe_width:
+            pipe_ind = 1
+
+        alive = np.flatnonzero(birds.alive)
+        birds.move()
+        t = profiler.add("physics", t)
+
+        y = birds.y[alive]
+        height = heights[alive, pipes[pipe_ind][1]]
+        inputs = np.column_stack((y, np.abs(y - height), np.abs(y - (height + game.Pipe.GAP))))
+        birds.jump(alive[activate(alive, inputs) > 0.5])
+        t = profiler.add("network", t)
+
+        rem = []
+        add_pipe = False
+        for pipe in pipes:
+            pipe[0] -= game.Pipe.VEL
+            height = heights[everyone, pipe[1]]
+            hit_top, hit_bottom = birds.collide_gap(pipe[0], height - pipe_height, height + game.Pipe.GAP)
+            die(hit_top, "top pipe")
+            die(hit_bottom & ~hit_top, "bottom pipe")
+
+            if pipe[0] + pipe_width < 0:
+                rem.append(pipe)
+            if not pipe[2] and pipe[0] < birds.x:
+                pipe[2] = True
+                add_pipe = True
+
+        if add_pipe:
+            score += 1
+            pipes.append([game.WIN_WIDTH, score, False])
+        for r in rem:
+            pipes.remove(r)
+        t = profiler.add("collision", t)
+
+        out = birds.out_of_bounds(game.FLOOR)
+        ceiling = out & (birds.y < -50)
+        die(ceiling, "ceiling")
+        die(out & ~ceiling, "floor")
+
+        if score > max_score:
+            die(birds.alive, "finished")
+        profiler.add("collision", t)
+
+    return scores, frames, causes
+
+
+def course_fitness(scores, frames, causes):
+    """
+    the fitness that eval_genomes gives for games played with simulate_courses: 0.1 for every frame,
+    5 for every pipe, -1 for hitting a pipe and 1000 for finishing
+    :return: fitness array
+    """
+    fitness = 0.1 * np.asarray(frames) + 5 * np.asarray(scores)
+    fitness -= np.array([cause in ("top pipe", "bottom pipe") for cause in causes])
+    fitness[np.array([cause == "finished" for cause in causes], dtype=bool)] = 1000
+    return fitness
+
+
+def play(genomes, config, course=None, recorder=None, publisher=None):
+    """
+    lets all genomes play one game together and returns their fitness
+    :param genomes: list of genomes
+    :param config: neat config
+    :param course: Course to play, None plays game.new_course()
+    :param recorder: replay.Recorder that records the jumps, None records nothing
+    :param publisher: live.Publisher for viewers of the training, None publishes nothing
+    :return: list with the fitness of every genome
+    """
+    if course is None:
+        course = game.new_course()
+    nets = BatchedNetworks.create(genomes, config)
+
+    def activate(alive, inputs):
+        return nets.activate(inputs, alive)[:, 0]
+
+    fitness, score, frames = simulate(BirdPopulation(len(genomes)), course, activate, recorder=recorder, publisher=publisher)
+    return fitness.tolist()
+
+
+def eval_genomes(genomes, config, course_seed=None):
+    """
+    drop-in replacement for flappy_bird_neat.eval_genomes that simulates the
+    whole generation with a BirdPopulation, always without a screen
+    :param course_seed: seed of the course to play, None uses game.new_course
+    """
+    game.gen += 1
+
+    genomes = [genome for genome_id, genome in genomes]
+    course = game.new_course(course_seed)
+    recorder = None
+    if game.RECORD:
+        import replay
+        recorder = replay.Recorder(course.seed, game.gen)
+
+    for genome, fitness in zip(genomes, play(genomes, config, course, recorder, game.live_publisher)):
+        genome.fitness = fitness
+
+    if recorder is not None:
+        recorder.save(replay.generation_file(game.RECORD, game.gen))
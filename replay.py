@@ -0,0 +1,371 @@
+"""
+Recordings of games, to look at a generation or a game of the best bird afterwards.
+The game is deterministic, so a recording only needs the seed of the course and for every bird
+one bit per frame: did it jump or not. The bits are packed 8 per byte and compressed, a whole
+generation is a few KB. The Player rebuilds any frame by simulating the game again, on the way it
+keeps a keyframe with the complete state every KEYFRAME_EVERY frames so seeking stays fast.
+
+    python flappy_bird_neat.py train --record replays
+    python flappy_bird_neat.py replay replays/gen-0007.flr
+
+File layout: MAGIC, version (1 byte), flags (1 byte), length of the header (4 bytes), the header as
+JSON and then the packed bits of every bird after each other, zlib compressed if flags has COMPRESSED.
+"""
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+
+import flappy_bird_neat as game
+
+MAGIC = b"FLRP"
+VERSION = 1
+COMPRESSED = 1
+HEADER = struct.Struct("<4sBBI")
+
+
+def pack_bits(bits):
+    """
+    packs a sequence of 0/1 values, 8 per byte
+    :param bits: bytearray or list with a 0 or 1 per frame
+    :return: bytes
+    """
+    return np.packbits(np.frombuffer(bytes(bits), dtype=np.uint8), bitorder="little").tobytes()
+
+
+def unpack_bits(data, count):
+    """
+    the opposite of pack_bits
+    :param data: bytes
+    :param count: number of bits (int)
+    :return: bytearray with a 0 or 1 per frame
+    """
+    return bytearray(np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count, bitorder="little").tobytes())
+
+
+def generation_file(directory, generation):
+    """
+    the file for the recording of a generation
+    :param directory: str
+    :param generation: int
+    :return: str
+    """
+    return os.path.join(directory, "gen-{:04d}.flr".format(generation))
+
+
+class Replay:
+    """
+    a recorded game: the course and the jumps of every bird
+    """
+
+    def __init__(self, seed, jumps, generation=None, max_score=None):
+        """
+        Initialize the replay
+        :param seed: seed of the course (int)
+        :param jumps: list with a bytearray per bird, with a 0 or 1 for every frame the bird was alive
+        :param generation: the generation that played, None for a game of the best bird (int)
+        :param max_score: MAX_SCORE of the game (int)
+        :return: None
+        """
+        self.seed = seed
+        self.jumps = jumps
+        self.generation = generation
+        self.max_score = max_score
+
+    def __len__(self):
+        """
+        number of frames of the game
+        :return: int
+        """
+        return max([len(bits) for bits in self.jumps] or [0])
+
+    def save(self, filename, compress=True):
+        """
+        writes the replay to a file
+        :param filename: str
+        :param compress: compress the jumps with zlib (bool)
+        :return: None
+        """
+        header = json.dumps({
+            "seed": self.seed,
+            "generation": self.generation,
+            "max_score": self.max_score,
+            "frames": [len(bits) for bits in self.jumps],
+        }, separators=(",", ":")).encode()
+        body = b"".join(pack_bits(bits) for bits in self.jumps)
+        flags = 0
+        if compress:
+            body = zlib.compress(body, 9)
+            flags |= COMPRESSED
+
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filename, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, flags, len(header)))
+            f.write(header)
+            f.write(body)
+
+    @staticmethod
+    def load(filename):
+        """
+        reads a replay file
+        :param filename: str
+        :return: Replay
+        """
+        with open(filename, "rb") as f:
+            data = f.read()
+        magic, version, flags, header_size = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a replay file")
+        if version != VERSION:
+            raise ValueError("unsupported replay version {!r}".format(version))
+
+        start = HEADER.size + header_size
+        header = json.loads(data[HEADER.size:start].decode())
+        body = data[start:]
+        if flags & COMPRESSED:
+            body = zlib.decompress(body)
+
+        jumps = []
+        offset = 0
+        for count in header["frames"]:
+            size = (count + 7) // 8
+            jumps.append(unpack_bits(body[offset:offset + size], count))
+            offset += size
+        return Replay(header["seed"], jumps, header["generation"], header["max_score"])
+
+
+class Recorder:
+    """
+    records the jumps of the birds while a game is played
+    """
+
+    def __init__(self, seed, generation=None):
+        """
+        Initialize an empty recording
+        :param seed: seed of the course that is played (int)
+        :param generation: the generation that plays, None for a game of the best bird (int)
+        :return: None
+        """
+        self.seed = seed
+        self.generation = generation
+        self.jumps = []
+
+    def record(self, slot, jumped):
+        """
+        records the decision of one living bird in this frame
+        :param slot: number of the bird (int)
+        :param jumped: bool
+        :return: None
+        """
+        while slot >= len(self.jumps):
+            self.jumps.append(bytearray())
+        self.jumps[slot].append(1 if jumped else 0)
+
+    def record_many(self, slots, jumped):
+        """
+        records the decisions of all living birds in this frame at once
+        :param slots: array with the numbers of the living birds
+        :param jumped: bool array with a value per living bird
+        :return: None
+        """
+        for slot, j in zip(slots.tolist(), jumped.tolist()):
+            self.record(slot, j)
+
+    def replay(self):
+        """
+        the recording so far
+        :return: Replay
+        """
+        return Replay(self.seed, self.jumps, self.generation, game.MAX_SCORE)
+
+    def save(self, filename, compress=True):
+        """
+        writes the recording to a file
+        :param filename: str
+        :param compress: compress the jumps with zlib (bool)
+        :return: None
+        """
+        self.replay().save(filename, compress)
+
+
+class Player:
+    """
+    rebuilds the frames of a Replay by playing the game again with the recorded jumps
+    """
+    KEYFRAME_EVERY = 250
+
+    def __init__(self, replay):
+        """
+        Initialize the player at frame 0, before the first move
+        :param replay: Replay
+        :return: None
+        """
+        self.replay = replay
+        self.course = game.Course(replay.seed)
+        self.keyframes = {}
+        self.restart()
+
+    def restart(self):
+        """
+        goes back to frame 0
+        :return: None
+        """
+        self.frame = 0
+        self.score = 0
+        self.birds = [game.Bird(230, 350) for _ in self.replay.jumps]
+        self.pipes = game.Pipes(700, self.course[0])
+        self.base = game.Base(game.FLOOR)
+
+    def living(self):
+        """
+        the birds that are still alive after the current frame
+        :return: list of Bird objects
+        """
+        return [bird for bird, bits in zip(self.birds, self.replay.jumps) if len(bits) > self.frame]
+
+    def pipe_ind(self):
+        """
+        index of the pipe the birds look at
+        :return: int
+        """
+        if len(self.pipes) > 1 and 230 > self.pipes[0].x + self.pipes[0].PIPE_TOP.get_width():
+            return 1
+        return 0
+
+    def step(self):
+        """
+        plays one frame, with the same order of moves as eval_genomes
+        :return: None
+        """
+        self.frame += 1
+        for bird, bits in zip(self.birds, self.replay.jumps):
+            # Een vogel leeft zolang er sprongen van hem opgenomen zijn
+            if len(bits) >= self.frame:
+                bird.move()
+                if bits[self.frame - 1]:
+                    bird.jump()
+        self.base.move()
+
+        rem = 0
+        add_pipe = False
+        for pipe in self.pipes:
+            pipe.move()
+            if pipe.x + pipe.PIPE_TOP.get_width() < 0:
+                rem += 1
+            if not pipe.passed and pipe.x < 230:
+                pipe.passed = True
+                add_pipe = True
+
+        if add_pipe:
+            self.score += 1
+            self.pipes.append(game.WIN_WIDTH, self.course[self.score])
+        self.pipes.drop(rem)
+
+        if self.frame % self.KEYFRAME_EVERY == 0 and self.frame not in self.keyframes:
+            self.keyframes[self.frame] = self.snapshot()
+
+    def snapshot(self):
+        """
+        the complete state of the current frame
+        :return: tuple
+        """
+        birds = [(b.y, b.vel, b.tick_count, b.tilt, b.height) for b in self.birds]
+        pipes = [(p.x, p.height, p.passed) for p in self.pipes]
+        return self.score, birds, pipes, self.base.x1, self.base.x2
+
+    def restore(self, frame):
+        """
+        goes to the keyframe of a frame
+        :param frame: int
+        :return: None
+        """
+        self.score, birds, pipes, self.base.x1, self.base.x2 = self.keyframes[frame]
+        self.frame = frame
+        for bird, (y, vel, tick_count, tilt, height) in zip(self.birds, birds):
+            bird.y, bird.vel, bird.tick_count, bird.tilt, bird.height = y, vel, tick_count, tilt, height
+        self.pipes.clear()
+        for x, height, passed in pipes:
+            self.pipes.append(x, height).passed = passed
+
+    def seek(self, frame):
+        """
+        goes to a frame, starting at the closest keyframe before it
+        :param frame: int, limited to the length of the replay
+        :return: None
+        """
+        frame = max(0, min(frame, len(self.replay)))
+        keyframe = max([k for k in self.keyframes if k <= frame] or [0])
+        if frame < self.frame or keyframe > self.frame:
+            if keyframe:
+                self.restore(keyframe)
+            else:
+                self.restart()
+        while self.frame < frame:
+            self.step()
+
+    def draw(self, win):
+        """
+        draws the current frame like the game does
+        :param win: pygame window or surface
+        :return: None
+        """
+        if self.replay.generation is None:
+            game.bestGameDraw(win, self.birds[0], self.pipes, self.base, self.score)
+        else:
+            game.draw_window(win, self.living(), self.pipes, self.base, self.score,
+                             self.replay.generation, self.pipe_ind())
+
+
+def play(filename, speed=1.0):
+    """
+    shows a replay in the window. Space pauses, left and right seek 5 seconds, up and down
+    change the speed and home goes back to the start
+    :param filename: str
+    :param speed: frames of the game per frame on the screen (float)
+    :return: None
+    """
+    import pygame
+
+    replay = Replay.load(filename)
+    player = Player(replay)
+    win = game.assets.win
+    clock = pygame.time.Clock()
+    position = 0.0
+    paused = False
+
+    run = True
+    while run:
+        clock.tick(100)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                run = False
+            elif event.type == pygame.VIDEOEXPOSE:
+                game.dirty_rects.reset()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    position += 500
+                elif event.key == pygame.K_LEFT:
+                    position -= 500
+                elif event.key == pygame.K_UP:
+                    speed *= 2
+                elif event.key == pygame.K_DOWN:
+                    speed /= 2
+                elif event.key == pygame.K_HOME:
+                    position = 0.0
+                elif event.key == pygame.K_ESCAPE:
+                    run = False
+
+        if not paused:
+            position += speed
+        # Aan het eind blijft de laatste frame staan
+        position = max(0.0, min(position, float(len(replay))))
+        player.seek(int(position))
+        player.draw(win)
+        pygame.display.set_caption("replay {}  frame {}/{}  x{:g}".format(
+            os.path.basename(filename), player.frame, len(replay), speed))
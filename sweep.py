@@ -0,0 +1,121 @@
+"""
+Hyperparameter sweep: trains with every combination of a grid of config settings, each combination
+in its own process, and writes the results of all runs to one summary file.
+
+    python flappy_bird_neat.py sweep --set pop_size=50,100 --set conn_add_prob=0.3,0.5 --generations 20 --seed 1 --vectorized
+"""
+import ast
+import itertools
+import json
+import multiprocessing
+import time
+
+import flappy_bird_neat as game
+import parallel
+
+
+def parse_grid(specs):
+    """
+    reads the --set options
+    :param specs: list of "name=value1,value2" strings
+    :return: dict with the values to try per setting
+    """
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or not values:
+            raise ValueError("expected NAME=V1,V2 but got {!r}".format(spec))
+        grid[name.strip()] = [parse_value(value) for value in values.split(",")]
+    return grid
+
+
+def parse_value(value):
+    """
+    converts a value from the command line to a number or bool when possible
+    :param value: str
+    :return: int, float, bool or str
+    """
+    value = value.strip()
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def combinations(grid):
+    """
+    all combinations of the grid
+    :param grid: dict with the values to try per setting
+    :return: list of dicts
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_one(job):
+    """
+    trains with one combination of settings, runs in its own process
+    :param job: (config file, overrides, generations, settings of the game)
+    :return: dict with the result
+    """
+    config_file, overrides, generations, settings = job
+    parallel.apply_settings(settings)
+
+    start = time.perf_counter()
+    winner, stats = game.train(game.load_config(config_file, overrides), generations,
+                               checkpoints=False, save=False, verbose=False)
+    return {
+        "overrides": overrides,
+        "best_fitness": winner.fitness,
+        "generations": len(stats.most_fit_genomes),
+        "mean_fitness_last_generation": stats.get_fitness_mean()[-1],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def main(args):
+    """
+    runs the sweep from the parsed command line options of flappy_bird_neat.main
+    :param args: argparse.Namespace
+    :return: list with the results of every run
+    """
+    grid = parse_grid(args.set)
+    # Elke combinatie wordt eerst geladen, zodat een verkeerde naam meteen een fout geeft
+    runs = combinations(grid)
+    for overrides in runs:
+        game.load_config(args.config, overrides)
+
+    # De runs zijn al aparte processen, binnen een run wordt er dus niet nog eens over processen verdeeld
+    settings = parallel.settings(parallel.TRAIN_SETTINGS)
+    settings["HEADLESS"] = True
+    settings["WORKERS"] = 0
+    # Opnames, live viewers en telemetry bestanden van verschillende runs zouden elkaar in de weg zitten
+    settings["RECORD"] = None
+    settings["LIVE"] = None
+    settings["TELEMETRY"] = None
+    jobs = [(args.config, overrides, args.generations, settings) for overrides in runs]
+
+    start = time.perf_counter()
+    # Met --cluster doen de workers het werk en speelt elke run op dezelfde poort, dus een run tegelijk
+    jobs_at_once = 1 if game.CLUSTER else args.jobs or multiprocessing.cpu_count()
+    with multiprocessing.Pool(jobs_at_once) as pool:
+        results = pool.map(run_one, jobs)
+
+    summary = {
+        "config": args.config,
+        "grid": grid,
+        "generations": args.generations,
+        "settings": settings,
+        "seconds": time.perf_counter() - start,
+        "runs": results,
+    }
+    filename = args.summary or "sweep.json"
+    with open(filename, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    for result in sorted(results, key=lambda r: r["best_fitness"], reverse=True):
+        print("{:10.1f} {:4d} gens  {}".format(result["best_fitness"], result["generations"], result["overrides"]))
+    print("Resultaten opgeslagen in " + filename)
+    return results
@@ -0,0 +1,120 @@
+"""
+Timing of the phases of a frame during training and a reporter that writes them per generation.
+The game loops add the time of every phase to PhaseTimer, the TelemetryReporter writes one line
+per generation to a JSONL or CSV file, next to the output of the other NEAT reporters.
+"""
+import csv
+import json
+import time
+
+import neat
+
+
+class PhaseTimer:
+    """
+    sums how much time every phase of a frame takes, over one generation
+    """
+    PHASES = ("physics", "network", "collision", "pipes", "draw")
+
+    def __init__(self):
+        """
+        Initialize the timer
+        :return: None
+        """
+        self.reset()
+
+    def reset(self):
+        """
+        start timing a new generation
+        :return: None
+        """
+        self.times = dict((phase, 0.0) for phase in self.PHASES)
+        self.frames = 0
+        self.alive = 0
+        self.started = time.perf_counter()
+
+    def frame(self, alive):
+        """
+        count a frame
+        :param alive: number of living birds in this frame (int)
+        :return: the current time, to time the first phase with (float)
+        """
+        self.frames += 1
+        self.alive += alive
+        return time.perf_counter()
+
+    def add(self, phase, start):
+        """
+        add the time since start to a phase
+        :param phase: name of the phase (str)
+        :param start: time.perf_counter() at the start of the phase (float)
+        :return: the current time, to time the next phase with (float)
+        """
+        now = time.perf_counter()
+        self.times[phase] += now - start
+        return now
+
+    def summary(self):
+        """
+        the numbers of this generation
+        :return: dict
+        """
+        wall_time = time.perf_counter() - self.started
+        row = {
+            "frames": self.frames,
+            "wall_time": wall_time,
+            "fps": self.frames / wall_time if wall_time > 0 else 0.0,
+            "alive_per_frame": self.alive / self.frames if self.frames else 0.0,
+        }
+        row.update(self.times)
+        return row
+
+
+class TelemetryReporter(neat.reporting.BaseReporter):
+    """
+    NEAT reporter that writes the PhaseTimer numbers and some statistics of every generation to a
+    file, as JSON lines or (if the filename ends with .csv) as CSV
+    """
+    FIELDS = ("generation", "population", "species", "best_fitness", "frames", "wall_time", "fps",
+              "alive_per_frame") + PhaseTimer.PHASES
+
+    def __init__(self, filename, timer):
+        """
+        Initialize the reporter
+        :param filename: file to write to, it is overwritten (str)
+        :param timer: the PhaseTimer the game loop uses
+        :return: None
+        """
+        self.timer = timer
+        self.generation = None
+        self.file = open(filename, "w", newline="")
+        self.csv = None
+        if filename.endswith(".csv"):
+            self.csv = csv.DictWriter(self.file, fieldnames=self.FIELDS)
+            self.csv.writeheader()
+
+    def close(self):
+        """
+        closes the file
+        :return: None
+        """
+        self.file.close()
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.timer.reset()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        row = {
+            "generation": self.generation,
+            "population": len(population),
+            "species": len(species.species),
+            "best_fitness": best_genome.fitness,
+        }
+        row.update(self.timer.summary())
+
+        if self.csv is not None:
+            self.csv.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
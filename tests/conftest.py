@@ -0,0 +1,42 @@
+import os
+import random
+import sys
+
+import neat
+import pytest
+
+# De modules staan in de map boven tests, en zonder scherm opent pygame geen venster
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config-feedforward.txt")
+
+ACTIVATIONS = ("tanh", "sigmoid", "relu", "identity")
+
+
+@pytest.fixture
+def mutated():
+    """
+    a generation of genomes with hidden nodes, disabled connections and several activation functions
+    :return: (neat config, list of (genome_id, genome) tuples)
+    """
+    import flappy_bird_neat as game
+
+    config = game.load_config(CONFIG_FILE)
+    rng = random.Random(11)
+    random.seed(11)
+    genomes = list(neat.Population(config).population.items())
+    for i, (genome_id, genome) in enumerate(genomes):
+        for _ in range(i % 4):
+            genome.mutate_add_node(config.genome_config)
+        for _ in range(i % 3):
+            genome.mutate_add_connection(config.genome_config)
+        for _ in range(3):
+            genome.mutate(config.genome_config)
+        for connection in genome.connections.values():
+            if rng.random() < 0.2:
+                connection.enabled = False
+        for node in genome.nodes.values():
+            node.activation = ACTIVATIONS[rng.randrange(len(ACTIVATIONS))]
+    return config, genomes
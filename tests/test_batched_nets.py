@@ -0,0 +1,35 @@
+"""
+BatchedNetworks gives the same outputs as neat.nn.FeedForwardNetwork.
+"""
+import neat
+import numpy as np
+
+from batched_nets import BatchedNetworks
+
+
+def test_same_outputs_as_feed_forward(mutated):
+    config, genomes = mutated
+    genomes = [genome for genome_id, genome in genomes]
+    assert any(len(genome.nodes) > 1 for genome in genomes)
+    assert any(not connection.enabled for genome in genomes for connection in genome.connections.values())
+
+    nets = BatchedNetworks.create(genomes, config)
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        # Dezelfde soort waardes als in het spel: de y van de vogel en de afstand tot de pijpen
+        inputs = rng.uniform(-100, 800, size=(len(genomes), 3))
+        batched = nets.activate(inputs)
+        for genome, row, out in zip(genomes, inputs, batched):
+            expected = neat.nn.FeedForwardNetwork.create(genome, config).activate(row.tolist())
+            np.testing.assert_allclose(out, expected, rtol=0, atol=1e-12)
+
+
+def test_subset_of_networks(mutated):
+    config, genomes = mutated
+    genomes = [genome for genome_id, genome in genomes]
+    nets = BatchedNetworks.create(genomes, config)
+    which = np.array([3, 0, 3, 7])
+    inputs = np.random.default_rng(4).uniform(-100, 800, size=(len(which), 3))
+    for i, row, out in zip(which, inputs, nets.activate(inputs, which)):
+        expected = neat.nn.FeedForwardNetwork.create(genomes[i], config).activate(row.tolist())
+        np.testing.assert_allclose(out, expected, rtol=0, atol=1e-12)
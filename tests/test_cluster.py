@@ -0,0 +1,140 @@
+"""
+The coordinator with real worker processes on localhost.
+"""
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+
+import neat
+import pytest
+
+import cluster
+import flappy_bird_neat as game
+import population
+from conftest import CONFIG_FILE
+
+COURSE_SEED = 3
+
+
+@pytest.fixture
+def key(monkeypatch):
+    monkeypatch.setenv("FLAPPY_CLUSTER_KEY", "test-secret")
+
+
+@pytest.fixture
+def genomes():
+    config = game.load_config(CONFIG_FILE)
+    random.seed(7)
+    return config, list(neat.Population(config).population.items())
+
+
+def reference(genomes, config):
+    population.eval_genomes(genomes, config, COURSE_SEED)
+    result = [genome.fitness for genome_id, genome in genomes]
+    for genome_id, genome in genomes:
+        genome.fitness = None
+    return result
+
+
+def start_workers(coordinator, count):
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=cluster.work, args=(("127.0.0.1", coordinator.address[1]),), daemon=True)
+               for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def stop(coordinator, workers):
+    coordinator.close()
+    for worker in workers:
+        if sys.platform != "win32":
+            os.kill(worker.pid, signal.SIGCONT)
+        worker.kill()
+        worker.join()
+
+
+def test_same_fitness_with_a_killed_worker(key, genomes):
+    config, genomes = genomes
+    expected = reference(genomes, config)
+
+    coordinator = cluster.Coordinator(("127.0.0.1", 0), batch_size=2, timeout=30)
+    workers = start_workers(coordinator, 3)
+    try:
+        thread = threading.Thread(target=coordinator.eval_genomes, args=(genomes, config, COURSE_SEED))
+        thread.start()
+        # Een worker stopt zodra de eerste batches klaar zijn, midden in de generatie
+        while not coordinator.results:
+            time.sleep(0.01)
+        workers[0].kill()
+        thread.join(60)
+        assert not thread.is_alive()
+        assert [genome.fitness for genome_id, genome in genomes] == expected
+    finally:
+        stop(coordinator, workers)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs SIGSTOP")
+def test_batch_of_a_hanging_worker_goes_to_another(key, genomes):
+    config, genomes = genomes
+    expected = reference(genomes, config)
+
+    coordinator = cluster.Coordinator(("127.0.0.1", 0), batch_size=5, timeout=2)
+    workers = start_workers(coordinator, 2)
+    try:
+        while coordinator.workers < 2:
+            time.sleep(0.01)
+        os.kill(workers[0].pid, signal.SIGSTOP)
+        coordinator.eval_genomes(genomes, config, COURSE_SEED)
+        assert [genome.fitness for genome_id, genome in genomes] == expected
+    finally:
+        stop(coordinator, workers)
+
+
+def test_batch_that_is_always_too_slow_stops_the_training(key, genomes):
+    config, genomes = genomes
+    coordinator = cluster.Coordinator(("127.0.0.1", 0), batch_size=50, timeout=0.001, attempts=2)
+    workers = start_workers(coordinator, 2)
+    try:
+        with pytest.raises(RuntimeError, match="cluster-timeout"):
+            coordinator.eval_genomes(genomes, config, COURSE_SEED)
+    finally:
+        stop(coordinator, workers)
+
+
+def test_error_in_a_worker_stops_the_generation(key, genomes):
+    config, genomes = genomes
+    coordinator = cluster.Coordinator(("127.0.0.1", 0), batch_size=5, timeout=30)
+    workers = start_workers(coordinator, 2)
+    try:
+        with pytest.raises(RuntimeError, match="AttributeError"):
+            coordinator.eval_genomes(genomes[:4] + [(-1, "not a genome")], config, COURSE_SEED)
+        # De workers leven nog en spelen de volgende generatie gewoon
+        expected = reference(genomes, config)
+        coordinator.eval_genomes(genomes, config, COURSE_SEED)
+        assert [genome.fitness for genome_id, genome in genomes] == expected
+        assert all(worker.is_alive() for worker in workers)
+    finally:
+        stop(coordinator, workers)
+
+
+def test_wrong_key_is_refused(key, monkeypatch):
+    coordinator = cluster.Coordinator(("127.0.0.1", 0))
+    try:
+        monkeypatch.setenv("FLAPPY_CLUSTER_KEY", "wrong-secret")
+        with pytest.raises(AuthenticationError):
+            cluster.work(("127.0.0.1", coordinator.address[1]), forever=False)
+        assert coordinator.workers == 0
+    finally:
+        coordinator.close()
+
+
+def test_no_key(monkeypatch):
+    monkeypatch.delenv("FLAPPY_CLUSTER_KEY", raising=False)
+    with pytest.raises(RuntimeError, match="FLAPPY_CLUSTER_KEY"):
+        cluster.Coordinator(("127.0.0.1", 0))
@@ -0,0 +1,41 @@
+"""
+The numpy simulation of a whole generation gives the same fitness as the classic game loop.
+"""
+import numpy as np
+
+import flappy_bird_neat as game
+import population
+
+
+def fitness(genomes):
+    result = [genome.fitness for genome_id, genome in genomes]
+    for genome_id, genome in genomes:
+        genome.fitness = None
+    return result
+
+
+def test_same_fitness_as_eval_genomes(mutated, monkeypatch):
+    config, genomes = mutated
+    monkeypatch.setattr(game, "HEADLESS", True)
+    for course_seed in (1, 2, 3):
+        game.eval_genomes(genomes, config, course_seed)
+        expected = fitness(genomes)
+        assert len(set(expected)) > 1
+        population.eval_genomes(genomes, config, course_seed)
+        assert fitness(genomes) == expected
+
+
+def test_same_moves_as_bird():
+    birds = [game.Bird(230, 350) for _ in range(4)]
+    flock = population.BirdPopulation(len(birds))
+    rng = np.random.default_rng(5)
+    for frame in range(300):
+        jump = rng.random(len(birds)) < 0.1
+        for bird, jumps in zip(birds, jump):
+            bird.move()
+            if jumps:
+                bird.jump()
+        flock.move()
+        flock.jump(np.flatnonzero(jump))
+        assert flock.y.tolist() == [bird.y for bird in birds]
+        assert flock.tilt.tolist() == [bird.tilt for bird in birds]